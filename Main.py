@@ -6,26 +6,60 @@ except ModuleNotFoundError:
 
 
 import argparse
+import heapq
+import json
+import random
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
 import os
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
-SCRAPERS: List[str] = [
-    "scraping_idartes.py",
-    "scraping_teatropablotobon.py",
-    "scraping_teatroplasa.py",
-]
+# Las fuentes (URL, script, función, archivo JSON) se declaran en fuentes.py
+REGISTRY: str = "fuentes.py"
+GENERIC_SCRAPER: str = "extraccion.py"  # fuentes sin script propio: extraccion.py --fuente <clave>
 LOADER: str = "cargar_eventos.py"
+LOAD_MODES: Tuple[str, ...] = ("lote", "fila", "upsert")  # cargar_eventos.MODOS_CARGA
+DEFAULT_LOAD_MODE: str = "lote"
+RUN_LOG: str = "resumen_extracciones.log"  # el mismo que lee Metricas.py
+ARCHIVE_DIR: str = "archivo_html"            # archivo_respuestas.ARCHIVO_DIR
+
+SCRAPER_TIMEOUT: float = 300  # segundos por scraper (subproceso) antes de matarlo
+ERR_TAIL_LINES: int = 50      # líneas finales de stderr que se guardan para el reporte de [FAIL]
+
+_print_lock = threading.Lock()
+
+# Modo --daemon: minutos entre corridas de cada fuente (se puede cambiar con --intervalo)
+DAEMON_INTERVALS: Dict[str, float] = {"idartes": 60, "pablobon": 30, "plaza": 30}
+DEFAULT_INTERVAL: float = 60
 
 
 def resolve_python(python_bin: Optional[str]) -> str:
     return python_bin or sys.executable
 
 
+def load_sources(workdir: Path, selection: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """clave → declaración de fuentes.py; `selection`: 'a,b' (None = todas)."""
+    try:
+        decls = import_from(workdir, "fuentes", "seleccionar")(selection)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    return {d["clave"]: d for d in decls}
+
+
+def scraper_command(key: str, decl: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Script y argumentos con que se lanza el scraper de una fuente como subproceso."""
+    if decl.get("script"):
+        return decl["script"], []
+    return GENERIC_SCRAPER, ["--fuente", key]
+
+
 def ensure_files_exist(files: List[str], base: Path) -> None:
     missing = [f for f in files if not (base / f).exists()]
     if missing:
@@ -36,9 +70,31 @@ def ensure_files_exist(files: List[str], base: Path) -> None:
         )
 
 
-def run_cmd(pyfile: str, python_bin: str, workdir: Path, show_cmds: bool = False) -> Tuple[str, int, float, str]:
+def pump(stream: Any, prefix: str, tail: Optional[deque]) -> None:
+    """Lee la salida del hijo a medida que llega: stdout se reenvía con prefijo, stderr a `tail`."""
+    for line in stream:
+        if tail is not None:
+            tail.append(line.rstrip("\n"))
+        else:
+            with _print_lock:
+                print(prefix + line, end="" if line.endswith("\n") else "\n", flush=True)
+    stream.close()
+
+
+def run_cmd(pyfile: str, python_bin: str, workdir: Path, show_cmds: bool = False,
+            extra_args: Optional[List[str]] = None, metrics: Any = None,
+            timeout: Optional[float] = None, label: Optional[str] = None) -> Tuple[str, int, float, str]:
+    """
+    La salida del hijo se procesa línea a línea (nada se acumula en memoria):
+    stdout se reenvía con el prefijo '[label] ' (por defecto el nombre del
+    script) y de stderr se guardan las
+    últimas ERR_TAIL_LINES líneas para el reporte de error.
+    `timeout`: segundos de reloj; si el hijo no termina, se mata (código 124).
+    `metrics`: Corrida de metricas_corrida; el subproceso vuelca lo que midió
+    (fetch/parse/bd…) en un archivo temporal y aquí se suma a la corrida.
+    """
     start = time.time()
-    cmd = [python_bin, str(workdir / pyfile)]
+    cmd = [python_bin, str(workdir / pyfile)] + (extra_args or [])
     if show_cmds:
         print(f"CMD> {' '.join(cmd)}")
 
@@ -46,6 +102,11 @@ def run_cmd(pyfile: str, python_bin: str, workdir: Path, show_cmds: bool = False
     env = os.environ.copy()
     env["PYTHONIOENCODING"] = "utf-8"
     env["PYTHONUTF8"] = "1"
+    metrics_file = None
+    if metrics is not None:
+        fd, metrics_file = tempfile.mkstemp(prefix="metricas_", suffix=".json")
+        os.close(fd)
+        env[import_from(workdir, "metricas_corrida", "ENV_SALIDA")] = metrics_file
 
     proc = subprocess.Popen(
         cmd,
@@ -56,28 +117,158 @@ def run_cmd(pyfile: str, python_bin: str, workdir: Path, show_cmds: bool = False
         encoding="utf-8",
         errors="replace",
         env=env,
+        bufsize=1,
     )
-    out, err = proc.communicate()
+    err_tail: deque = deque(maxlen=ERR_TAIL_LINES)
+    readers = [
+        threading.Thread(target=pump, args=(proc.stdout, f"[{label or Path(pyfile).stem}] ", None), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, "", err_tail), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        proc.kill()
+        proc.wait()
+    for t in readers:
+        t.join()
     dur = round(time.time() - start, 2)
+    code = 124 if timed_out else proc.returncode
+    err = "\n".join(err_tail)
+    if timed_out:
+        err = f"Timeout: sin terminar tras {timeout}s; proceso terminado.\n{err}".rstrip()
+    if metrics_file:
+        try:
+            with open(metrics_file, "r", encoding="utf-8") as f:
+                metrics.fusionar(json.load(f))
+        except (OSError, ValueError):
+            pass  # el subproceso murió antes de volcar sus métricas
+        finally:
+            os.remove(metrics_file)
+
+    return (label or pyfile, code, dur, err)
+
+
+def import_module(workdir: Path, module: str) -> Any:
+    if str(workdir) not in sys.path:
+        sys.path.insert(0, str(workdir))
+    return importlib.import_module(module)
+
 
-    if out:
-        print(out, end="")
+def import_from(workdir: Path, module: str, attr: str) -> Callable[..., Any]:
+    return getattr(import_module(workdir, module), attr)
 
-    return (pyfile, proc.returncode, dur, err)
+
+def setup_archive(args: argparse.Namespace, workdir: Path) -> Dict[str, str]:
+    """
+    --archivar: graba cada respuesta HTTP de esta corrida (comprimida, por fuente).
+    --replay: sirve las páginas desde una corrida archivada, sin red. Los JSON de
+    los scrapers se escriben en <corrida>/salida (fuentes.ENV_SALIDA) y el cargador
+    los lee de ahí: los scraping_*.json publicados, que son también el último JSON
+    bueno de cada fuente, no se pisan con datos históricos.
+    El modo se fija en este proceso (descargas.configurar_archivo) y en el entorno,
+    que heredan los subprocesos. Devuelve lo que se agrega al registro de la corrida.
+    """
+    if args.archivar is None and args.replay is None:
+        return {}
+    archive = import_module(workdir, "archivo_respuestas")
+    configure = import_from(workdir, "descargas", "configurar_archivo")
+    if args.replay is not None:
+        try:
+            path = archive.resolver_corrida(args.replay or None)
+        except FileNotFoundError as e:
+            raise SystemExit(str(e))
+        os.environ[archive.ENV_REPRODUCIR] = str(path)
+        configure(reproducir=str(path))
+        output = path / "salida"
+        output.mkdir(exist_ok=True)
+        os.environ[import_module(workdir, "fuentes").ENV_SALIDA] = str(output)
+        pages = archive.ArchivoRespuestas(path).resumen()
+        print(f"⏪ Replay de {path.name}: " + ", ".join(f"{k} ({n} págs.)" for k, n in pages.items())
+              + f" · salida en {output}")
+        return {"replay": path.name}
+    path = (workdir / args.archivar) / archive.nombre_corrida()
+    os.environ[archive.ENV_GRABAR] = str(path)
+    configure(grabar=str(path))
+    print(f"🗄️ Archivando respuestas en {path}")
+    return {"archivo": path.name}
+
+
+def prefetch_pages(workdir: Path, sources: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Descarga en paralelo (descargas.descargar_paginas) la página de cada fuente.
+    Devuelve clave → descargas.Pagina, o la excepción si esa descarga falló.
+    """
+    pages = import_from(workdir, "descargas", "descargar_paginas")([d["url"] for d in sources.values()])
+    return dict(zip(sources, pages))
+
+
+def run_inprocess(key: str, decl: Dict[str, Any], workdir: Path, results: Dict[str, list],
+                  page: Any = None, fmt: str = "json") -> Tuple[str, int, float, str]:
+    """
+    Ejecuta el scraper de la fuente como función en este mismo intérprete (sin
+    Popen): la 'funcion' declarada o, si no tiene, el extractor declarativo.
+    Deja la lista de eventos en results[clave] y mantiene el JSON en disco
+    para que el archivo publicado siga actualizado.
+    `page`: Pagina ya descargada por prefetch_pages (None → el scraper la descarga);
+    si no cambió desde la última corrida (304) se reutiliza el parseo en caché.
+    """
+    start = time.time()
+    try:
+        scraper = import_from(workdir, "extraccion", "scraper")(key)
+        if isinstance(page, BaseException):
+            raise page
+        if page is None:
+            eventos = scraper()
+        else:
+            eventos = import_from(workdir, "descargas", "parsear_pagina")(page, scraper)
+        results[key] = eventos
+        save = import_from(workdir, "salida_eventos", "guardar_eventos")
+        save(eventos, import_from(workdir, "fuentes", "ruta_archivo")(decl), fmt, eco=False)
+        print(f"{key}: {len(eventos)} eventos en memoria")
+        code, err = 0, ""
+    except Exception as e:
+        code, err = 1, f"{type(e).__name__}: {e}"
+    return (key, code, round(time.time() - start, 2), err)
+
+
+def note_fallback(key: str, decl: Dict[str, Any], workdir: Path, stop_on_fail: bool) -> None:
+    """Fuente caída (p. ej. circuito abierto): el loader usa su último JSON bueno en disco."""
+    if not stop_on_fail and Path(import_from(workdir, "fuentes", "ruta_archivo")(decl)).exists():
+        print(f"↩️  {key}: se cargará el último JSON bueno ({decl['archivo']})")
 
 
 def run_scrapers(parallel: bool, max_workers: int, stop_on_fail: bool,
-                 python_bin: str, workdir: Path, show_cmds: bool) -> Tuple[float, int]:
+                 python_bin: str, workdir: Path, show_cmds: bool,
+                 results: Optional[Dict[str, list]] = None, fmt: str = "json",
+                 metrics: Any = None, timeout: Optional[float] = SCRAPER_TIMEOUT,
+                 sources: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[float, int]:
+    """
+    results=None → cada scraper en su propio subproceso.
+    results=dict → modo en proceso; los eventos quedan en el dict por fuente.
+    sources: fuentes a correr (load_sources); None = todas las registradas.
+    """
+    sources = sources if sources is not None else load_sources(workdir)
     print("Lanzando scrapings " + ("en paralelo" if parallel else "en secuencia"))
     t0 = time.time()
     failures = 0
+    pages = prefetch_pages(workdir, sources) if results is not None else {}
+
+    def run_one(key: str) -> Tuple[str, int, float, str]:
+        if results is not None:
+            return run_inprocess(key, sources[key], workdir, results, pages.get(key), fmt)
+        script, extra = scraper_command(key, sources[key])
+        return run_cmd(script, python_bin, workdir, show_cmds, extra + ["--formato", fmt],
+                       metrics, timeout, label=key)
 
     if parallel:
         with ThreadPoolExecutor(max_workers=max_workers) as ex:
-            futures = {ex.submit(run_cmd, s, python_bin, workdir, show_cmds): s for s in SCRAPERS}
+            futures = {ex.submit(run_one, s): s for s in sources}
             for f in as_completed(futures):
-                name, code, dur, err = f.result()
-                tag = Path(name).stem
+                tag, code, dur, err = f.result()
                 if code == 0:
                     print(f"[OK] {tag} ({dur}s)")
                 else:
@@ -85,14 +276,14 @@ def run_scrapers(parallel: bool, max_workers: int, stop_on_fail: bool,
                     print(f"[FAIL] {tag} ({dur}s)")
                     if err:
                         print(err)
+                    note_fallback(tag, sources[tag], workdir, stop_on_fail)
                     if stop_on_fail:
                         for other in futures:
                             other.cancel()
                         break
     else:
-        for s in SCRAPERS:
-            name, code, dur, err = run_cmd(s, python_bin, workdir, show_cmds)
-            tag = Path(name).stem
+        for s in sources:
+            tag, code, dur, err = run_one(s)
             if code == 0:
                 print(f"[OK] {tag} ({dur}s)")
             else:
@@ -100,6 +291,7 @@ def run_scrapers(parallel: bool, max_workers: int, stop_on_fail: bool,
                 print(f"[FAIL] {tag} ({dur}s)")
                 if err:
                     print(err)
+                note_fallback(tag, sources[tag], workdir, stop_on_fail)
                 if stop_on_fail:
                     break
 
@@ -108,9 +300,33 @@ def run_scrapers(parallel: bool, max_workers: int, stop_on_fail: bool,
     return total, failures
 
 
-def run_loader(python_bin: str, workdir: Path, show_cmds: bool) -> int:
+def run_loader_inprocess(workdir: Path, results: Dict[str, list], incremental: bool = False,
+                         keys: Optional[List[str]] = None, mode: str = DEFAULT_LOAD_MODE,
+                         dedup: bool = False) -> Tuple[str, int, float, str]:
+    start = time.time()
+    try:
+        ok = import_from(workdir, "cargar_eventos", "cargar_datos")(modo=mode, eventos_por_fuente=results,
+                                                                    incremental=incremental,
+                                                                    fuentes=keys, dedup_difuso=dedup)
+        code, err = (0 if ok else 1), ""
+    except Exception as e:
+        code, err = 1, f"{type(e).__name__}: {e}"
+    return (LOADER, code, round(time.time() - start, 2), err)
+
+
+def run_loader(python_bin: str, workdir: Path, show_cmds: bool,
+               results: Optional[Dict[str, list]] = None, incremental: bool = False,
+               metrics: Any = None, keys: Optional[List[str]] = None, mode: str = DEFAULT_LOAD_MODE,
+               dedup: bool = False) -> int:
+    """keys: solo estas fuentes (None = todas las de cargar_eventos.FUENTES)."""
     print("Cargando datos a BD...")
-    name, code, dur, err = run_cmd(LOADER, python_bin, workdir, show_cmds)
+    if results is not None:
+        name, code, dur, err = run_loader_inprocess(workdir, results, incremental, keys, mode, dedup)
+    else:
+        extra = (["--modo", mode] + (["--incremental"] if incremental else [])
+                 + (["--dedup-difuso"] if dedup else [])
+                 + (["--fuentes", ",".join(keys)] if keys else []))
+        name, code, dur, err = run_cmd(LOADER, python_bin, workdir, show_cmds, extra, metrics)
     tag = Path(name).stem
     if code == 0:
         print(f"[OK] {tag} ({dur}s)")
@@ -121,6 +337,134 @@ def run_loader(python_bin: str, workdir: Path, show_cmds: bool) -> int:
     return code
 
 
+def run_source(key: str, decl: Dict[str, Any], workdir: Path,
+               args: argparse.Namespace) -> Tuple[int, float, str]:
+    """Una fuente completa en este proceso: scraping + carga solo de esa fuente."""
+    start = time.time()
+    results: Dict[str, list] = {}
+    _, code, _, err = run_inprocess(key, decl, workdir, results, None, args.formato)
+    if code == 0 and not args.skip_load:
+        try:
+            ok = import_from(workdir, "cargar_eventos", "cargar_datos")(
+                modo=args.modo_carga, eventos_por_fuente=results, incremental=args.incremental, fuentes=[key])
+            code = 0 if ok else 1
+        except Exception as e:
+            code, err = 1, f"{type(e).__name__}: {e}"
+    return code, round(time.time() - start, 2), err
+
+
+def parse_intervals(values: List[str], keys: List[str]) -> Dict[str, float]:
+    intervals = {k: DAEMON_INTERVALS.get(k, DEFAULT_INTERVAL) for k in keys}
+    for item in values:
+        source, _, minutes = item.partition("=")
+        if source not in intervals or not minutes:
+            raise SystemExit(f"--intervalo inválido: {item!r} (usa fuente=minutos; fuentes: {', '.join(intervals)})")
+        intervals[source] = float(minutes)
+    return intervals
+
+
+def run_daemon(args: argparse.Namespace, workdir: Path, metricas: Any,
+               sources: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Proceso residente: cada fuente se refresca cada `intervalo` minutos (± jitter)
+    sin relanzar Python, así que las sesiones HTTP (descargas.DESCARGADOR), el pool
+    de la BD (db.py) y las cachés (HTTP, parseos, fechas) quedan calientes. Los
+    workers de parseo del crawl de Idartes se arrancan una vez al iniciar.
+    Si a una fuente le toca turno mientras su corrida anterior sigue en curso, no
+    se lanza otra: se deja una sola repetición pendiente para cuando termine.
+    """
+    intervals = parse_intervals(args.intervalo, list(sources))
+    cond = threading.Condition()
+    stop = threading.Event()
+    running, pending = set(), set()
+    timeline: List[Tuple[float, str]] = []
+
+    def next_due(source: str) -> float:
+        secs = intervals[source] * 60
+        return time.monotonic() + secs * (1 + random.uniform(-args.jitter, args.jitter))
+
+    def schedule(due: float, source: str) -> None:
+        with cond:
+            heapq.heappush(timeline, (due, source))
+            cond.notify()
+
+    def request_stop(*_: Any) -> None:
+        stop.set()
+        with cond:
+            cond.notify()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    corrida = metricas.actual()
+
+    def job(source: str) -> None:
+        # Nadie mira el futuro de ex.submit: un error aquí se perdería y la fuente
+        # quedaría en `running` para siempre, así que se informa y se libera siempre
+        try:
+            ts_start = time.time()
+            code, dur, err = run_source(source, sources[source], workdir, args)
+            status = "OK" if code == 0 else "FAILED"
+            print(f"[{status}] {source} ({dur}s)")
+            if err:
+                print(err)
+            if args.metricas:
+                record = {
+                    "ts_start": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts_start)),
+                    "ts_end": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration_sec": dur,
+                    "status": status,
+                    "fuente": source,
+                    "modo": "daemon",
+                }
+                metricas.escribir_jsonl(record, str(workdir / args.metricas))
+                store = import_from(workdir, "almacen_corridas", "AlmacenCorridas")()
+                try:
+                    store.agregar(record)
+                finally:
+                    store.cerrar()
+            if args.prometheus:
+                # Acumulado desde que arrancó el daemon (contadores crecientes)
+                metricas.exportar_prometheus(corrida.resumen(status), str(workdir / args.prometheus))
+        except Exception as e:
+            print(f"⚠️ {source}: error en la corrida del daemon ({type(e).__name__}: {e})")
+        finally:
+            with cond:
+                running.discard(source)
+                if source in pending:
+                    pending.discard(source)
+                    heapq.heappush(timeline, (time.monotonic(), source))
+                    cond.notify()
+
+    if "idartes" in sources:
+        import_from(workdir, "scraping_idartes", "calentar_pool")()
+
+    # Primer turno escalonado para no pegarle a todos los hosts en el mismo segundo
+    for source in intervals:
+        schedule(time.monotonic() + random.uniform(0, 5), source)
+    print("Daemon iniciado: " + ", ".join(f"{s} cada {m:g} min" for s, m in intervals.items())
+          + f" (jitter ±{int(args.jitter * 100)}%)")
+
+    with ThreadPoolExecutor(max_workers=len(intervals)) as ex:
+        try:
+            while not stop.is_set():
+                with cond:
+                    wait = timeline[0][0] - time.monotonic() if timeline else None
+                    if wait is None or wait > 0:
+                        cond.wait(timeout=wait)
+                        continue
+                    _, source = heapq.heappop(timeline)
+                    if source in running:
+                        pending.add(source)
+                        print(f"⏭️ {source}: la corrida anterior sigue en curso; se repetirá al terminar")
+                        continue
+                    running.add(source)
+                schedule(next_due(source), source)
+                ex.submit(job, source)
+        except KeyboardInterrupt:
+            stop.set()
+        print("Deteniendo daemon: esperando corridas en curso...")
+    import_from(workdir, "db", "cerrar_pool")()
+
+
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(
         description="Pipeline scraping → carga BD (HU-09). Orquesta scrapers y cargador con opción de paralelo.",
@@ -133,16 +477,98 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--cwd", type=str, default=".", help="Directorio base del pipeline")
     ap.add_argument("--python", type=str, default=None, help="Ruta del intérprete Python")
     ap.add_argument("--show-cmds", action="store_true", help="Imprime los comandos ejecutados")
+    ap.add_argument("--in-process", action="store_true",
+                    help="Importa los scrapers como funciones y pasa los eventos al cargador en memoria "
+                         "(sin un subproceso por script)")
+    ap.add_argument("--formato", choices=["json", "ndjson"], default="json",
+                    help="Salida de los scrapers; ndjson = un evento por línea (el cargador lo lee en streaming)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="El cargador solo envía a BD los eventos nuevos o modificados (índice local de hashes)")
+    ap.add_argument("--modo-carga", choices=LOAD_MODES, default=DEFAULT_LOAD_MODE,
+                    help="Modo de cargar_eventos: lote (staging + merge), fila, o upsert (ON CONFLICT sobre "
+                         "el índice único; requiere 'cargar_eventos.py --migrar-dedup' una vez)")
+    ap.add_argument("--dedup-difuso", action="store_true",
+                    help="El cargador fusiona eventos casi repetidos entre fuentes antes de insertar "
+                         "(no aplica a --daemon, que carga cada fuente por separado)")
+    archive = ap.add_mutually_exclusive_group()
+    archive.add_argument("--archivar", nargs="?", const=ARCHIVE_DIR, default=None, metavar="DIR",
+                         help="Guarda cada respuesta HTTP de la corrida comprimida en DIR/<corrida>/<fuente>/")
+    archive.add_argument("--replay", nargs="?", const="", default=None, metavar="CORRIDA",
+                         help="Sin red: scrapers, normalización y carga sobre las páginas de una corrida "
+                              f"archivada (nombre en {ARCHIVE_DIR}/ o ruta; sin valor, la última)")
+    ap.add_argument("--metricas", nargs="?", const=RUN_LOG, default=None, metavar="RUTA",
+                    help="Agrega la corrida como línea JSON (tiempos por etapa/fuente, bytes, reintentos, "
+                         "eventos); sin RUTA usa el log que lee Metricas.py")
+    ap.add_argument("--prometheus", type=str, default=None, metavar="RUTA",
+                    help="Escribe la última corrida en formato textfile de Prometheus (p. ej. quehay.prom)")
+    ap.add_argument("--fuentes", type=str, default=None, metavar="A,B",
+                    help="Solo estas fuentes de fuentes.py (claves separadas por coma); por defecto todas")
+    ap.add_argument("--scraper-timeout", type=float, default=SCRAPER_TIMEOUT,
+                    help="Segundos máximos por scraper (subproceso); al vencer se mata el proceso. 0 = sin límite")
+    ap.add_argument("--daemon", action="store_true",
+                    help="Proceso residente: refresca cada fuente según su intervalo, con sesiones HTTP, "
+                         "pool de BD y cachés calientes (implica --in-process)")
+    ap.add_argument("--intervalo", action="append", default=[], metavar="FUENTE=MIN",
+                    help="Minutos entre corridas de una fuente en --daemon (repetible), p. ej. plaza=10")
+    ap.add_argument("--jitter", type=float, default=0.1,
+                    help="Variación aleatoria relativa del intervalo en --daemon (0.1 = ±10%%)")
     return ap.parse_args()
 
 
+def print_stages(record: Dict[str, Any], stages: Tuple[str, ...]) -> None:
+    """Tabla corta fuente × etapa para ubicar el cuello de botella."""
+    sources = record.get("fuentes") or {}
+    if not sources:
+        return
+    print("Tiempo por etapa (s):")
+    print("  " + f"{'fuente':<28}" + "".join(f"{e:>11}" for e in stages) + f"{'eventos':>9}{'reintentos':>11}")
+    for name, values in sources.items():
+        events = values.get("eventos_parseados", values.get("eventos_validos", 0))
+        print("  " + f"{name:<28}" + "".join(f"{values.get(e + '_s', 0):>11.3f}" for e in stages)
+              + f"{int(events):>9}{int(values.get('reintentos_http', 0)):>11}")
+
+
 def main() -> None:
     args = parse_args()
 
     workdir = Path(args.cwd).resolve()
     python_bin = resolve_python(args.python)
 
-    ensure_files_exist(SCRAPERS + [LOADER], workdir)
+    ensure_files_exist([REGISTRY, LOADER], workdir)
+    sources = load_sources(workdir, args.fuentes)
+    ensure_files_exist(sorted({scraper_command(k, d)[0] for k, d in sources.items()}), workdir)
+
+    metricas = import_module(workdir, "metricas_corrida")
+    corrida = metricas.iniciar()
+    if args.daemon:
+        if args.archivar is not None or args.replay is not None:
+            raise SystemExit("--archivar/--replay no aplican a --daemon")
+        run_daemon(args, workdir, metricas, sources)
+        return
+    archive_info = setup_archive(args, workdir)
+    status, code, failures = "FAILED", 0, 0
+    try:
+        code, failures = run_pipeline(args, workdir, python_bin, corrida, sources)
+        status = "OK" if code == 0 and failures == 0 else "FAILED"
+    finally:
+        record = corrida.resumen(status, scrapers_fallidos=failures, **archive_info)
+        print_stages(record, metricas.ETAPAS)
+        if args.metricas:
+            metricas.escribir_jsonl(record, str(workdir / args.metricas))
+            store = import_from(workdir, "almacen_corridas", "AlmacenCorridas")()
+            store.agregar(record)
+            store.cerrar()
+        if args.prometheus:
+            metricas.exportar_prometheus(record, str(workdir / args.prometheus))
+    if code:
+        sys.exit(code)
+    print("Pipeline finalizado correctamente.")
+
+
+def run_pipeline(args: argparse.Namespace, workdir: Path, python_bin: str, corrida: Any,
+                 sources: Dict[str, Dict[str, Any]]) -> Tuple[int, int]:
+    """Scrapers + carga. Devuelve (código de salida del pipeline, scrapers con error)."""
+    results: Optional[Dict[str, list]] = {} if args.in_process else None
 
     total_time, failures = run_scrapers(
         parallel=args.parallel,
@@ -151,20 +577,26 @@ def main() -> None:
         python_bin=python_bin,
         workdir=workdir,
         show_cmds=args.show_cmds,
+        results=results,
+        fmt=args.formato,
+        metrics=corrida,
+        timeout=args.scraper_timeout or None,
+        sources=sources,
     )
 
     if failures > 0 and args.stop_on_scraper_fail:
         print(f"Se detectaron {failures} scraper(s) con error. Pipeline detenido antes de la carga.")
-        sys.exit(2)
+        return 2, failures
 
     if not args.skip_load:
-        rc = run_loader(python_bin, workdir, args.show_cmds)
+        keys = list(sources) if args.fuentes else None
+        rc = run_loader(python_bin, workdir, args.show_cmds, results, args.incremental, corrida, keys,
+                        args.modo_carga, args.dedup_difuso)
         if rc != 0:
-            sys.exit(rc)
+            return rc, failures
     else:
         print("Carga a BD omitida por --skip-load")
-
-    print("Pipeline finalizado correctamente.")
+    return 0, failures
 
 
 if __name__ == "__main__":
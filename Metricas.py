@@ -1,72 +1,97 @@
 # metrics.py — HU-06 Dashboard de métricas (CLI)
-import json
+import argparse
 from datetime import datetime, timedelta
-import psycopg2
 
-DB_CONFIG = {
-    "host": "awsaurorapg17-instance-1.cav2004g2f8p.us-east-1.rds.amazonaws.com",
-    "port": "5432",
-    "dbname": "QueHayPaHacer",
-    "user": "postgres",
-    "password": "postgres"
-}
+from almacen_corridas import DIAS_DETALLE, AlmacenCorridas
+from db import conexion, ejecutar_preparada
 
 LOG_PATH = "resumen_extracciones.log"
+TABLAS = ("idartes_eventos", "teatropablobon_eventos", "teatroplaza_eventos")
+MODOS_CONTEO = ("estimado", "exacto")
+TTL_CONTEOS = 60  # segundos; refrescos seguidos del dashboard no tocan la BD (caché en corridas.sqlite)
+
+def abrir_almacen():
+    # El log sigue siendo la fuente: solo se importa lo agregado desde la última vez
+    almacen = AlmacenCorridas()
+    almacen.importar_log(LOG_PATH)
+    return almacen
 
 def leer_corridas(dias=7):
-    ahora = datetime.now()
-    desde = ahora - timedelta(days=dias)
-    corridas = []
+    desde = datetime.now() - timedelta(days=dias)
+    almacen = abrir_almacen()
     try:
-        with open(LOG_PATH, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                # hay dos tipos de líneas: texto (resumen por fuente) y JSON (corrida)
-                if line.startswith("{") and line.endswith("}"):
-                    try:
-                        obj = json.loads(line)
-                        ts = datetime.strptime(obj["ts_start"], "%Y-%m-%d %H:%M:%S")
-                        if ts >= desde:
-                            corridas.append(obj)
-                    except Exception:
-                        pass
-    except FileNotFoundError:
-        pass
-    return corridas
+        return almacen.corridas(desde)
+    finally:
+        almacen.cerrar()
+
+def _contar_exacto(cur, tablas):
+    # Todos los COUNT(*) en una sola sentencia → un round trip
+    sql = "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {t})" for t in tablas)
+    ejecutar_preparada(cur, "contar_" + "_".join(t.split("_")[0] for t in tablas), sql, ())
+    return tuple(cur.fetchone())
+
+def _contar_estimado(cur):
+    # reltuples lo mantienen VACUUM/ANALYZE (autovacuum): leerlo no recorre las tablas
+    ejecutar_preparada(cur, "estimar_tablas", """
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_class c
+        WHERE c.relname = ANY($1) AND c.relkind = 'r' AND pg_table_is_visible(c.oid)
+    """, (list(TABLAS),), ("text[]",))
+    estimados = dict(cur.fetchall())
+    # -1 = tabla nunca analizada: solo esas se cuentan exacto
+    faltan = [t for t in TABLAS if estimados.get(t, -1) < 0]
+    if faltan:
+        estimados.update(zip(faltan, _contar_exacto(cur, faltan)))
+    return tuple(estimados[t] for t in TABLAS)
 
-def contar_tablas():
-    with psycopg2.connect(**DB_CONFIG) as conn:
+def contar_tablas(modo="estimado", ttl=TTL_CONTEOS, almacen=None):
+    """
+    (idartes, pablobon, plaza).
+    modo='estimado' → pg_class.reltuples (sin recorrer las tablas);
+    modo='exacto'   → COUNT(*) de las tres tablas en un solo round trip.
+    Con `almacen` (AlmacenCorridas) el resultado queda guardado en corridas.sqlite y
+    las ejecuciones siguientes lo reutilizan durante `ttl` segundos (0 = siempre consulta).
+    """
+    if modo not in MODOS_CONTEO:
+        raise ValueError(f"Modo de conteo desconocido: {modo!r} (usa {', '.join(MODOS_CONTEO)})")
+    previo = almacen.conteos(modo, ttl) if almacen and ttl else None
+    if previo is not None:
+        return tuple(previo)
+    # Conexión del pool compartido (db.py) y conteos preparados una vez por conexión
+    with conexion() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM idartes_eventos;")
-            idartes = cur.fetchone()[0]
-            cur.execute("SELECT COUNT(*) FROM teatropablobon_eventos;")
-            pablobon = cur.fetchone()[0]
-            cur.execute("SELECT COUNT(*) FROM teatroplaza_eventos;")
-            plaza = cur.fetchone()[0]
-    return idartes, pablobon, plaza
+            conteos = _contar_estimado(cur) if modo == "estimado" else _contar_exacto(cur, TABLAS)
+    if almacen:
+        almacen.guardar_conteos(modo, conteos)
+    return conteos
 
 def main():
-    corridas = leer_corridas(dias=7)
-    total = len(corridas)
-    ok = sum(1 for c in corridas if c.get("status") == "OK")
-    failed = total - ok
-    if total > 0:
-        avg = round(sum(c.get("duration_sec", 0) for c in corridas) / total, 2)
-        last = max(corridas, key=lambda x: x["ts_start"])
-        last_str = f'{last["ts_start"]} [{last["status"]}] {last["duration_sec"]}s'
-    else:
-        avg = 0.0
-        last_str = "—"
+    ap = argparse.ArgumentParser(description="Dashboard de métricas del pipeline (HU-06)")
+    ap.add_argument("--dias", type=int, default=7, help="Ventana de corridas a resumir")
+    ap.add_argument("--compactar", type=int, nargs="?", const=DIAS_DETALLE, default=None, metavar="DIAS",
+                    help="Resume por día las corridas más viejas que DIAS y borra su detalle")
+    ap.add_argument("--conteo", choices=MODOS_CONTEO, default="estimado",
+                    help="estimado: pg_class.reltuples (instantáneo); exacto: COUNT(*) de cada tabla")
+    args = ap.parse_args()
+
+    almacen = abrir_almacen()
+    try:
+        if args.compactar is not None:
+            n = almacen.compactar(args.compactar)
+            print(f"🗜️ {n} corridas anteriores a {args.compactar} días resumidas por día")
+        r = almacen.resumen(datetime.now() - timedelta(days=args.dias))
+        last = r["ultima"]
+        last_str = f'{last["ts_start"]} [{last["status"]}] {last["duration_sec"]}s' if last else "—"
 
-    print("📊 Métricas últimos 7 días")
-    print(f"- Corridas: {total} (OK: {ok}, FAILED: {failed})")
-    print(f"- Duración promedio: {avg}s")
-    print(f"- Última: {last_str}\n")
+        print(f"📊 Métricas últimos {args.dias} días")
+        print(f"- Corridas: {r['total']} (OK: {r['ok']}, FAILED: {r['fallidas']})")
+        print(f"- Duración promedio: {r['duracion_promedio']}s")
+        print(f"- Última: {last_str}\n")
 
-    idartes, pablobon, plaza = contar_tablas()
-    print("📥 Registros en BD:")
+        idartes, pablobon, plaza = contar_tablas(args.conteo, almacen=almacen)
+    finally:
+        almacen.cerrar()
+    print("📥 Registros en BD" + (" (estimado)" if args.conteo == "estimado" else "") + ":")
     print(f"  - idartes_eventos: {idartes}")
     print(f"  - teatropablobon_eventos: {pablobon}")
     print(f"  - teatroplaza_eventos: {plaza}")
@@ -0,0 +1,251 @@
+# almacen_corridas.py — Almacén indexado (SQLite) de corridas del pipeline para Metricas.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent
+RUTA_ALMACEN = BASE_DIR / "corridas.sqlite"
+DIAS_DETALLE = 30  # corridas más viejas que esto se resumen por día
+FORMATO_TS = "%Y-%m-%d %H:%M:%S"
+BYTES_HUELLA = 512  # inicio del log que identifica al archivo (detecta rotaciones con copytruncate)
+# Con fuente en la clave: el daemon guarda una corrida por fuente y dos pueden
+# empezar y terminar en el mismo segundo
+TABLA_CORRIDA = """
+    CREATE TABLE IF NOT EXISTS corrida (
+        ts      REAL NOT NULL,          -- ts_start en epoch
+        ts_end  TEXT NOT NULL,
+        fuente  TEXT NOT NULL DEFAULT '',   -- '' = corrida completa del pipeline
+        duracion REAL NOT NULL,
+        status  TEXT NOT NULL,
+        registro TEXT NOT NULL,         -- línea JSON completa
+        PRIMARY KEY (ts, ts_end, fuente)
+    );
+"""
+
+
+def _epoch(ts: str) -> float:
+    return datetime.strptime(ts, FORMATO_TS).timestamp()
+
+
+class AlmacenCorridas:
+    """
+    Una fila por corrida con índice por ts_start: las consultas de una ventana
+    solo recorren esa ventana. El log de texto se importa de forma incremental
+    (se recuerda hasta qué byte se leyó) y las corridas viejas se compactan en
+    agregados diarios.
+    """
+
+    def __init__(self, ruta: Path = RUTA_ALMACEN):
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(TABLA_CORRIDA + """
+            CREATE TABLE IF NOT EXISTS corrida_diaria (
+                dia       TEXT PRIMARY KEY,     -- YYYY-MM-DD
+                corridas  INTEGER NOT NULL,
+                ok        INTEGER NOT NULL,
+                duracion_total REAL NOT NULL,
+                duracion_max   REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                clave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            );
+        """)
+        self._con.commit()
+        self._migrar_fuente()
+
+    def _migrar_fuente(self) -> None:
+        """Almacenes creados con la clave (ts, ts_end): se rehace la tabla con la fuente en la clave."""
+        if any(c[1] == "fuente" for c in self._con.execute("PRAGMA table_info(corrida)")):
+            return
+        self._con.execute("BEGIN IMMEDIATE")
+        try:
+            if not any(c[1] == "fuente" for c in self._con.execute("PRAGMA table_info(corrida)")):
+                self._con.execute("ALTER TABLE corrida RENAME TO corrida_sin_fuente")
+                self._con.execute(TABLA_CORRIDA)
+                self._con.execute("""
+                    INSERT OR IGNORE INTO corrida
+                    SELECT ts, ts_end, COALESCE(json_extract(registro, '$.fuente'), ''), duracion, status, registro
+                    FROM corrida_sin_fuente
+                """)
+                self._con.execute("DROP TABLE corrida_sin_fuente")
+            self._con.commit()
+        except BaseException:
+            self._con.rollback()
+            raise
+
+    # ---------- escritura ----------
+    def _meta(self, clave: str) -> Optional[str]:
+        fila = self._con.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def _insertar(self, registros: List[Dict[str, Any]]) -> int:
+        # Las corridas anteriores al último corte de compactar() ya están en corrida_diaria
+        corte = float(self._meta("compactado_hasta") or 0)
+        filas = []
+        for r in registros:
+            try:
+                ts = _epoch(r["ts_start"])
+                if ts < corte:
+                    continue
+                filas.append((ts, r.get("ts_end", ""), r.get("fuente") or "", float(r.get("duration_sec", 0)),
+                              r.get("status", ""), json.dumps(r, ensure_ascii=False)))
+            except (KeyError, ValueError, TypeError):
+                continue
+        antes = self._con.total_changes
+        # La clave (ts_start, ts_end, fuente) hace idempotente reimportar la misma corrida
+        self._con.executemany("INSERT OR IGNORE INTO corrida VALUES (?, ?, ?, ?, ?, ?)", filas)
+        return self._con.total_changes - antes
+
+    def agregar(self, registro: Dict[str, Any]) -> None:
+        with self._lock:
+            self._insertar([registro])
+            self._con.commit()
+
+    @staticmethod
+    def _identidad(f, st: os.stat_result, hasta: int) -> str:
+        """Dispositivo, inodo y hash del comienzo (hasta `hasta` bytes) del log abierto en `f`."""
+        f.seek(0)
+        return f"{st.st_dev}:{st.st_ino}:{hashlib.sha1(f.read(min(hasta, BYTES_HUELLA))).hexdigest()}"
+
+    def importar_log(self, ruta_log: str) -> int:
+        """
+        Lee solo lo agregado al log desde la última importación. Si el archivo
+        ya no es el mismo (otro inodo, otro comienzo o más corto: rotado o
+        truncado) se vuelve a leer desde el principio; las corridas repetidas o
+        ya compactadas no se vuelven a contar.
+        Devuelve cuántas corridas nuevas se guardaron.
+        """
+        try:
+            st = os.stat(ruta_log)
+        except OSError:
+            return 0
+        ruta = os.path.abspath(ruta_log)
+        clave, clave_id = f"offset:{ruta}", f"archivo:{ruta}"
+        with self._lock:
+            offset = int(self._meta(clave) or 0)
+            with open(ruta_log, "rb") as f:
+                if offset > st.st_size or self._meta(clave_id) not in (None, self._identidad(f, st, offset)):
+                    offset = 0
+                if offset == st.st_size:
+                    return 0
+                f.seek(offset)
+                bloque = f.read()
+                # Solo líneas completas; una línea a medio escribir se lee la próxima vez
+                fin = bloque.rfind(b"\n") + 1
+                identidad = self._identidad(f, st, offset + fin)
+            registros = []
+            for line in bloque[:fin].decode("utf-8", errors="replace").splitlines():
+                line = line.strip()
+                # hay dos tipos de líneas: texto (resumen por fuente) y JSON (corrida)
+                if line.startswith("{") and line.endswith("}"):
+                    try:
+                        registros.append(json.loads(line))
+                    except ValueError:
+                        pass
+            n = self._insertar(registros)
+            self._con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                  [(clave, str(offset + fin)), (clave_id, identidad)])
+            self._con.commit()
+        return n
+
+    def compactar(self, dias_detalle: int = DIAS_DETALLE) -> int:
+        """Resume por día las corridas anteriores a `dias_detalle` y borra su detalle."""
+        corte = (datetime.now() - timedelta(days=dias_detalle)).replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            self._con.execute("""
+                INSERT INTO corrida_diaria (dia, corridas, ok, duracion_total, duracion_max)
+                SELECT date(ts, 'unixepoch', 'localtime'), COUNT(*), SUM(status = 'OK'), SUM(duracion), MAX(duracion)
+                FROM corrida WHERE ts < ?
+                GROUP BY 1
+                ON CONFLICT (dia) DO UPDATE SET
+                    corridas = corridas + excluded.corridas,
+                    ok = ok + excluded.ok,
+                    duracion_total = duracion_total + excluded.duracion_total,
+                    duracion_max = MAX(duracion_max, excluded.duracion_max)
+            """, (corte.timestamp(),))
+            n = self._con.execute("DELETE FROM corrida WHERE ts < ?", (corte.timestamp(),)).rowcount
+            # Reimportar el log (p. ej. tras una rotación) no debe volver a sumar lo ya resumido
+            self._con.execute("INSERT OR REPLACE INTO meta VALUES ('compactado_hasta', ?)",
+                              (str(max(corte.timestamp(), float(self._meta("compactado_hasta") or 0))),))
+            self._con.commit()
+        return n
+
+    # ---------- consultas ----------
+    def corridas(self, desde: datetime, hasta: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Corridas con detalle en [desde, hasta), en orden cronológico."""
+        hasta_ts = hasta.timestamp() if hasta else float("inf")
+        with self._lock:
+            filas = self._con.execute(
+                "SELECT registro FROM corrida WHERE ts >= ? AND ts < ? ORDER BY ts",
+                (desde.timestamp(), hasta_ts),
+            ).fetchall()
+        return [json.loads(r[0]) for r in filas]
+
+    def resumen(self, desde: datetime) -> Dict[str, Any]:
+        """
+        Totales desde `desde` calculados en SQLite (sin decodificar cada corrida):
+        detalle + agregados diarios de los días ya compactados.
+        """
+        with self._lock:
+            total, ok, dur = self._con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 'OK'), 0), COALESCE(SUM(duracion), 0) "
+                "FROM corrida WHERE ts >= ?", (desde.timestamp(),)
+            ).fetchone()
+            d_total, d_ok, d_dur = self._con.execute(
+                "SELECT COALESCE(SUM(corridas), 0), COALESCE(SUM(ok), 0), COALESCE(SUM(duracion_total), 0) "
+                "FROM corrida_diaria WHERE dia >= ?", (desde.strftime("%Y-%m-%d"),)
+            ).fetchone()
+            ultima = self._con.execute(
+                "SELECT registro FROM corrida WHERE ts >= ? ORDER BY ts DESC LIMIT 1", (desde.timestamp(),)
+            ).fetchone()
+        total, ok, dur = total + d_total, ok + d_ok, dur + d_dur
+        return {
+            "total": total,
+            "ok": ok,
+            "fallidas": total - ok,
+            "duracion_promedio": round(dur / total, 2) if total else 0.0,
+            "ultima": json.loads(ultima[0]) if ultima else None,
+        }
+
+    def diarios(self, desde: datetime) -> List[Dict[str, Any]]:
+        with self._lock:
+            filas = self._con.execute(
+                "SELECT dia, corridas, ok, duracion_total, duracion_max FROM corrida_diaria "
+                "WHERE dia >= ? ORDER BY dia", (desde.strftime("%Y-%m-%d"),)
+            ).fetchall()
+        return [{"dia": d, "corridas": c, "ok": o, "duracion_promedio": round(t / c, 2) if c else 0.0,
+                 "duracion_max": m} for d, c, o, t, m in filas]
+
+    # ---------- conteos de tablas (caché entre ejecuciones de Metricas.py) ----------
+    def conteos(self, modo: str, ttl: float) -> Optional[List[int]]:
+        """Conteos guardados con `modo` hace menos de `ttl` segundos, o None."""
+        with self._lock:
+            valor = self._meta(f"conteos:{modo}")
+        if not valor:
+            return None
+        try:
+            d = json.loads(valor)
+            if time.time() - float(d["ts"]) < ttl:
+                return list(d["conteos"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def guardar_conteos(self, modo: str, conteos) -> None:
+        with self._lock:
+            self._con.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                              (f"conteos:{modo}", json.dumps({"ts": time.time(), "conteos": list(conteos)})))
+            self._con.commit()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._con.close()
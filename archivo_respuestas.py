@@ -0,0 +1,116 @@
+# archivo_respuestas.py — Archivo de respuestas HTTP crudas (gzip) por corrida y fuente, para reprocesar sin red
+"""
+Con el modo 'grabar', cada página que baja la capa HTTP (descargas.py) se
+guarda comprimida en
+
+  archivo_html/<corrida>/<fuente>/<sha1(url)[:16]>.html.gz
+  archivo_html/<corrida>/indice.jsonl     una línea por página: url, fuente, archivo, ts, bytes
+
+donde <corrida> es el instante de inicio (AAAAMMDDTHHMMSS) y <fuente> la clave
+de fuentes.py (o el host si no está registrado). Con el modo 'reproducir', la
+misma capa HTTP sirve cada URL desde una corrida archivada en lugar de ir a la
+red: los scrapers, la normalización y la carga corren igual, a velocidad local.
+
+Los subprocesos de Main.py heredan el modo por las variables ENV_GRABAR y
+ENV_REPRODUCIR (ruta de la corrida).
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import metricas_corrida
+
+BASE_DIR = Path(__file__).resolve().parent
+ARCHIVO_DIR = BASE_DIR / "archivo_html"
+ENV_GRABAR = "ARCHIVO_GRABAR"
+ENV_REPRODUCIR = "ARCHIVO_REPRODUCIR"
+NIVEL_GZIP = 6
+
+
+def nombre_corrida(ts: Optional[float] = None) -> str:
+    return time.strftime("%Y%m%dT%H%M%S", time.localtime(ts))
+
+
+def corridas(directorio: Path = ARCHIVO_DIR) -> List[Path]:
+    """Corridas archivadas, de la más vieja a la más nueva."""
+    if not Path(directorio).exists():
+        return []
+    return sorted(p for p in Path(directorio).iterdir() if (p / "indice.jsonl").exists())
+
+
+def resolver_corrida(nombre: Optional[str] = None, directorio: Path = ARCHIVO_DIR) -> Path:
+    """Ruta de la corrida `nombre` (nombre o ruta); sin nombre, la última archivada."""
+    if nombre:
+        ruta = Path(nombre)
+        ruta = ruta if ruta.is_dir() else Path(directorio) / nombre
+        if not (ruta / "indice.jsonl").exists():
+            raise FileNotFoundError(f"No hay corrida archivada en {ruta}")
+        return ruta
+    todas = corridas(directorio)
+    if not todas:
+        raise FileNotFoundError(f"No hay corridas archivadas en {directorio} (graba una con --archivar)")
+    return todas[-1]
+
+
+class ArchivoRespuestas:
+    """Una corrida del archivo: se graba (guardar) o se reproduce (leer)."""
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        self._indice: Optional[Dict[str, str]] = None
+
+    @staticmethod
+    def _archivo(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html.gz"
+
+    # ---------- grabar ----------
+    def guardar(self, url: str, texto: str) -> None:
+        fuente = metricas_corrida.nombre_fuente(urlsplit(url).netloc)
+        rel = f"{fuente}/{self._archivo(url)}"
+        data = gzip.compress(texto.encode("utf-8"), compresslevel=NIVEL_GZIP, mtime=0)
+        destino = self.ruta / rel
+        with self._lock:
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            tmp = destino.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, destino)
+            linea = {"url": url, "fuente": fuente, "archivo": rel, "ts": time.time(), "bytes": len(data)}
+            # Una escritura O_APPEND por línea: los subprocesos pueden grabar la misma corrida
+            with open(self.ruta / "indice.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+
+    # ---------- reproducir ----------
+    def indice(self) -> Dict[str, str]:
+        """url → archivo relativo (si una URL se grabó varias veces, gana la última)."""
+        with self._lock:
+            if self._indice is None:
+                self._indice = {}
+                with open(self.ruta / "indice.jsonl", "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            r = json.loads(line)
+                        except ValueError:
+                            continue  # línea a medio escribir
+                        self._indice[r["url"]] = r["archivo"]
+            return self._indice
+
+    def leer(self, url: str) -> Optional[str]:
+        rel = self.indice().get(url)
+        if rel is None:
+            return None
+        return gzip.decompress((self.ruta / rel).read_bytes()).decode("utf-8")
+
+    def resumen(self) -> Dict[str, int]:
+        """Páginas archivadas por fuente."""
+        conteo: Dict[str, int] = {}
+        for rel in self.indice().values():
+            fuente = rel.split("/", 1)[0]
+            conteo[fuente] = conteo.get(fuente, 0) + 1
+        return conteo
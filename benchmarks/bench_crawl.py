@@ -0,0 +1,79 @@
+# bench_crawl.py — Crawl multipágina de Idartes contra un servidor local: parseo en hilos vs pool de procesos
+"""
+Sirve N páginas (fixture de Idartes repetido, con enlaces únicos por página y
+paginador) desde un HTTP local y corre scrape_idartes_completo con distintos
+--procesos. 0 = parseo en hilos (GIL); >0 = extraccion.PoolParseo.
+
+  python benchmarks/bench_crawl.py --paginas 10 --repetir 5 --procesos 0 2 4
+"""
+import argparse
+import os
+import string
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import scraping_idartes  # noqa: E402
+from extraccion import pool_parseo  # noqa: E402
+
+
+def servidor(paginas: int, repetir: int) -> ThreadingHTTPServer:
+    with open(os.path.join(BASE_DIR, "fixtures", "html", "idartes.html"), "r", encoding="utf-8") as f:
+        base = f.read()
+    cuerpos = []
+    for n in range(paginas):
+        # Enlaces distintos por página: si no, el crawl corta por "página sin eventos nuevos"
+        html = base.replace('href="/es/', f'href="/es/{string.ascii_lowercase[n % 26]}{n}/') * repetir
+        cuerpos.append((html + f'<a href="?page={paginas - 1}">última</a>').encode("utf-8"))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            n = int(self.path.split("page=")[1]) if "page=" in self.path else 0
+            cuerpo = cuerpos[min(n, paginas - 1)]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark del crawl de Idartes: hilos vs procesos de parseo")
+    ap.add_argument("--paginas", type=int, default=10)
+    ap.add_argument("--repetir", type=int, default=5, help="Copias del fixture por página (más CPU por página)")
+    ap.add_argument("--procesos", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    ap.add_argument("--rondas", type=int, default=3)
+    args = ap.parse_args()
+
+    srv = servidor(args.paginas, args.repetir)
+    scraping_idartes.URL = f"http://127.0.0.1:{srv.server_address[1]}/agenda"
+    scraping_idartes.DESCARGADOR.cache = None  # medir parseo real, no la caché de 304
+    scraping_idartes.DESCARGADOR.limitar = False  # ni la tasa por host de politica_http
+
+    print(f"{os.cpu_count()} núcleos · {args.paginas} páginas x {args.repetir} copias del fixture")
+    print(f"{'procesos':>9}{'eventos':>9}{'mejor s':>10}{'eventos/s':>11}")
+    for procesos in args.procesos:
+        if procesos:
+            pool_parseo(procesos)._ejecutor()  # arrancar workers fuera de la medición
+        tiempos = []
+        for _ in range(args.rondas):
+            t0 = time.perf_counter()
+            eventos = scraping_idartes.scrape_idartes_completo(max_paginas=args.paginas, procesos=procesos)
+            tiempos.append(time.perf_counter() - t0)
+        mejor = min(tiempos)
+        print(f"{procesos:>9}{len(eventos):>9}{mejor:>10.3f}{len(eventos) / mejor:>11.1f}")
+    srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
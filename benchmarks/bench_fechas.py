@@ -0,0 +1,82 @@
+# bench_fechas.py — Micro-benchmark del normalizador de fechas (fechas_es) con textos reales y sintéticos
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import fechas_es  # noqa: E402
+
+MESES = list(fechas_es.MESES)
+
+
+def textos_reales() -> list:
+    """Fechas tal como aparecen en las agendas, reconstruidas a partir de los JSON publicados."""
+    out = []
+    with open(os.path.join(BASE_DIR, "scraping_idartes.json"), "r", encoding="utf-8") as f:
+        for ev in json.load(f):
+            fi, ff = ev.get("fecha_inicio"), ev.get("fecha_fin")
+            if not fi:
+                continue
+            ini = f"{int(fi[8:])} de {MESES[int(fi[5:7]) - 1]}"
+            fin = f"{int(ff[8:])} de {MESES[int(ff[5:7]) - 1]}" if ff else ini
+            out.append(ini if ini == fin else f"{ini} al {fin}")
+    out += ["5 de diciembre - 7:30 p.m.", "10 al 12 de noviembre", "Sábado 4 de octubre - 10.30 a.m.",
+            "Por confirmar", "N/A"]
+    return out
+
+
+def textos_sinteticos(n: int, distintos: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    formatos = [
+        lambda d, m, d2, m2: f"{d} de {m}",
+        lambda d, m, d2, m2: f"{d} al {d2} de {m}",
+        lambda d, m, d2, m2: f"{d} de {m} al {d2} de {m2}",
+        lambda d, m, d2, m2: f"{d} de {m} - {rnd.randint(1, 12)}:{rnd.choice(['00', '30'])} p.m.",
+        lambda d, m, d2, m2: f"{m} {d}",
+    ]
+    base = [rnd.choice(formatos)(rnd.randint(1, 28), rnd.choice(MESES), rnd.randint(1, 28), rnd.choice(MESES))
+            for _ in range(distintos)]
+    return [rnd.choice(base) for _ in range(n)]
+
+
+def medir(nombre: str, fn, textos: list, rondas: int) -> None:
+    mejores = []
+    for _ in range(rondas):
+        fechas_es.limpiar_cache()
+        t0 = time.perf_counter()
+        fn(textos)
+        mejores.append(time.perf_counter() - t0)
+    t = min(mejores)
+    print(f"  {nombre:<24}{t * 1000:>10.2f} ms{t / len(textos) * 1e9:>12.0f} ns/fecha")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmark de fechas_es")
+    ap.add_argument("--n", type=int, default=100_000, help="Fechas sintéticas a normalizar")
+    ap.add_argument("--distintos", type=int, default=500, help="Textos distintos entre los sintéticos")
+    ap.add_argument("--rondas", type=int, default=3)
+    args = ap.parse_args()
+
+    sin_cache = fechas_es._rango.__wrapped__
+    year = fechas_es.anio_actual()
+    casos = {
+        "reales (x1000)": textos_reales() * 1000,
+        f"sintéticos ({args.distintos} distintos)": textos_sinteticos(args.n, args.distintos),
+        "sintéticos (todos distintos)": textos_sinteticos(args.n, args.n),
+    }
+    for titulo, textos in casos.items():
+        print(f"{titulo}: {len(textos)} fechas")
+        medir("sin caché", lambda ts: [sin_cache(t, year) for t in ts if t and t != "N/A"], textos, args.rondas)
+        medir("normalizar_rango (LRU)", lambda ts: [fechas_es.normalizar_rango(t, year) for t in ts],
+              textos, args.rondas)
+        medir("normalizar_columna", lambda ts: fechas_es.normalizar_columna(ts, year), textos, args.rondas)
+    print(f"caché: {fechas_es.info_cache()}")
+
+
+if __name__ == "__main__":
+    main()
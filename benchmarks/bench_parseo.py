@@ -0,0 +1,54 @@
+# bench_parseo.py — Tiempo de parseo y pico de memoria por scraper y backend sobre fixtures/html
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from parseo_html import BACKENDS  # noqa: E402
+from scraping_idartes import scrape_idartes  # noqa: E402
+from scraping_teatropablotobon import scrape_eventos  # noqa: E402
+from scraping_teatroplasa import scrape_teatroplaza  # noqa: E402
+
+SCRAPERS = {
+    "idartes": scrape_idartes,
+    "teatropablotobon": scrape_eventos,
+    "teatroplasa": scrape_teatroplaza,
+}
+
+
+def medir(parsear, html: str, backend: str, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        eventos = parsear(html, backend)
+        tiempos.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    parsear(html, backend)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(eventos), statistics.median(tiempos), pico
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark de parseo (lxml+SoupStrainer vs html.parser)")
+    ap.add_argument("--repeticiones", type=int, default=20)
+    ap.add_argument("--sufijo", default="", help="p. ej. _x50 para fixtures generados con --repetir 50")
+    args = ap.parse_args()
+
+    print(f"{'scraper':<18}{'backend':<13}{'eventos':>8}{'mediana ms':>12}{'pico MiB':>10}")
+    for nombre, parsear in SCRAPERS.items():
+        ruta = os.path.join(BASE_DIR, "fixtures", "html", f"{nombre}{args.sufijo}.html")
+        with open(ruta, "r", encoding="utf-8") as f:
+            html = f.read()
+        for backend in BACKENDS:
+            n, mediana, pico = medir(parsear, html, backend, args.repeticiones)
+            print(f"{nombre:<18}{backend:<13}{n:>8}{mediana * 1000:>12.2f}{pico / 2**20:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
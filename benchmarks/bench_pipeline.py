@@ -0,0 +1,188 @@
+# bench_pipeline.py — Benchmark por etapa: parseo (fixtures HTML) → validación/normalización (JSON) → escritura BD
+"""
+Etapas:
+  parse:<scraper>     fixtures/html/<scraper>.html por la función del scraper
+  validar:<fuente>    JSON publicado por Normalizador.fila (lo que hace cargar_fuente antes de la BD)
+  bd:<fuente>         cargar_fuente contra un PostgreSQL local (--dsn o BENCH_PG_DSN); se omite si no hay
+
+Por etapa reporta eventos/s, latencia p50/p95/p99 por iteración y pico de memoria
+(tracemalloc en una pasada aparte, sin cronometrar, + RSS máximo del proceso).
+
+  python benchmarks/bench_pipeline.py --iteraciones 30
+  python benchmarks/bench_pipeline.py --dsn "host=localhost dbname=bench user=postgres"
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import cargar_eventos  # noqa: E402
+import db  # noqa: E402
+from scraping_idartes import scrape_idartes  # noqa: E402
+from scraping_teatropablotobon import scrape_eventos  # noqa: E402
+from scraping_teatroplasa import scrape_teatroplaza  # noqa: E402
+
+SCRAPERS = {
+    "idartes": scrape_idartes,
+    "teatropablotobon": scrape_eventos,
+    "teatroplasa": scrape_teatroplaza,
+}
+
+# Esquema mínimo de 'evento' para el PostgreSQL de prueba (aislado en su propio schema)
+ESQUEMA_BENCH = "bench_quehay"
+DDL_BENCH = f"""
+    DROP SCHEMA IF EXISTS {ESQUEMA_BENCH} CASCADE;
+    CREATE SCHEMA {ESQUEMA_BENCH};
+    SET search_path = {ESQUEMA_BENCH};
+    CREATE TYPE estadoeventoenum AS ENUM ('ACTIVO', 'INACTIVO');
+    CREATE TABLE evento (
+        id SERIAL PRIMARY KEY,
+        titulo TEXT NOT NULL,
+        descripcion TEXT,
+        estado estadoeventoenum,
+        imagen_url TEXT,
+        organizador_id INTEGER,
+        lugar_id INTEGER,
+        url_oficial TEXT,
+        es_gratuito BOOLEAN,
+        precio_desde NUMERIC,
+        moneda TEXT,
+        slug TEXT,
+        fecha_publicacion DATE
+    );
+"""
+
+
+def rss_max_mib() -> float:
+    # ru_maxrss: KiB en Linux, bytes en macOS
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def etapa(nombre: str, fn, iteraciones: int) -> dict:
+    """
+    Corre fn() `iteraciones` veces cronometradas y una más con tracemalloc para el
+    pico (el trazado frena el código medido); fn devuelve cuántos eventos procesó.
+    """
+    latencias, eventos = [], 0
+    for _ in range(iteraciones):
+        t0 = time.perf_counter()
+        eventos += fn()
+        latencias.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(latencias)
+    if len(latencias) >= 2:
+        p50, p95, p99 = (statistics.quantiles(latencias, n=100, method="inclusive")[i] for i in (49, 94, 98))
+    else:
+        p50 = p95 = p99 = latencias[0]
+    return {
+        "etapa": nombre,
+        "eventos_s": round(eventos / total, 1) if total else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "pico_etapa_mib": round(pico / 2**20, 2),
+        "rss_max_mib": round(rss_max_mib(), 1),
+    }
+
+
+def leer_json(fuente: str) -> list:
+    with open(cargar_eventos.FUENTES[fuente]["archivo"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validar(eventos: list) -> int:
+    fila = cargar_eventos.Normalizador("ACTIVO").fila
+    filas = [f for f in map(fila, eventos) if f is not None]
+    return len(filas)
+
+
+def preparar_bd(dsn: str) -> None:
+    """Apunta db.py al PostgreSQL de prueba y recrea el esquema aislado."""
+    import psycopg2
+    from psycopg2.extensions import parse_dsn
+
+    cfg = parse_dsn(dsn)
+    cfg["options"] = f"-c search_path={ESQUEMA_BENCH}"
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:  # `with conn` confirma la transacción, no cierra
+            cur.execute(DDL_BENCH)
+    finally:
+        conn.close()
+    db.cerrar_pool()
+    db.limpiar_catalogo()
+    db.DB_CONFIG.clear()
+    db.DB_CONFIG.update(cfg)
+
+
+def variantes(eventos: list, ronda: int) -> list:
+    """Copias con títulos únicos por ronda para que cada iteración inserte de verdad."""
+    return [dict(ev, nombre=f"{ev.get('nombre')} #{ronda}") if ev.get("nombre") else ev for ev in eventos]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark por etapa del pipeline de scraping/carga")
+    ap.add_argument("--iteraciones", type=int, default=20)
+    ap.add_argument("--repetir", type=int, default=100, help="Multiplica los eventos JSON en validar/bd")
+    ap.add_argument("--dsn", default=os.environ.get("BENCH_PG_DSN"), help="PostgreSQL local de prueba")
+    ap.add_argument("--modo", choices=cargar_eventos.MODOS_CARGA, default="lote")
+    ap.add_argument("--json", action="store_true", help="Salida como JSON lines (para comparar corridas)")
+    args = ap.parse_args()
+
+    resultados = []
+    for nombre, parsear in SCRAPERS.items():
+        with open(os.path.join(BASE_DIR, "fixtures", "html", f"{nombre}.html"), "r", encoding="utf-8") as f:
+            html = f.read()
+        resultados.append(etapa(f"parse:{nombre}", lambda: len(parsear(html)), args.iteraciones))
+
+    datos = {fuente: leer_json(fuente) * args.repetir for fuente in cargar_eventos.FUENTES}
+    for fuente, eventos in datos.items():
+        resultados.append(etapa(f"validar:{fuente}", lambda: validar(eventos), args.iteraciones))
+
+    if args.dsn:
+        preparar_bd(args.dsn)
+        if args.modo == "upsert":
+            with db.conexion() as conn:
+                cargar_eventos.migrar_dedup(conn)
+        for fuente, eventos in datos.items():
+            ronda = itertools.count()  # + la pasada de memoria
+
+            def escribir() -> int:
+                lote = variantes(eventos, next(ronda))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ok = cargar_eventos.cargar_fuente(fuente, {}, args.modo, lote, None)
+                if not ok:
+                    raise RuntimeError(f"Falló la carga de {fuente} en la BD de prueba")
+                return len(lote)
+
+            resultados.append(etapa(f"bd:{fuente}", escribir, args.iteraciones))
+        db.cerrar_pool()
+    else:
+        print("(etapa bd omitida: usa --dsn o BENCH_PG_DSN para un PostgreSQL local)", file=sys.stderr)
+
+    if args.json:
+        for r in resultados:
+            print(json.dumps(r, ensure_ascii=False))
+        return
+    print(f"{'etapa':<26}{'eventos/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'pico MiB':>10}{'RSS MiB':>9}")
+    for r in resultados:
+        print(f"{r['etapa']:<26}{r['eventos_s']:>12}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+              f"{r['pico_etapa_mib']:>10}{r['rss_max_mib']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# cache_http.py — Caché en disco de respuestas HTTP (ETag / Last-Modified) para los scrapers
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / ".cache_http"
+MAX_BYTES = 50 * 1024 * 1024      # tamaño total máximo de cuerpos en caché
+MAX_EDAD_HORAS = 7 * 24           # entradas más viejas se descartan
+
+
+def _clave(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _escribir_atomico(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class CacheHTTP:
+    """
+    Por URL guarda:
+      <clave>.body  → cuerpo descargado (texto UTF-8)
+      <clave>.meta  → {url, etag, last_modified, guardado, usado, bytes}
+      <clave>.<nombre>.deriv → resultados ya parseados de ese cuerpo (p. ej. eventos),
+                               se borran cuando el cuerpo cambia.
+    Evicción: por edad (MAX_EDAD_HORAS desde que se guardó) y por tamaño total
+    (MAX_BYTES, sale primero lo menos usado).
+    """
+
+    def __init__(self, directorio: Path = CACHE_DIR, max_bytes: int = MAX_BYTES,
+                 max_edad_horas: float = MAX_EDAD_HORAS):
+        self.dir = Path(directorio)
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad_horas * 3600
+        self._lock = threading.Lock()
+
+    # ---------- lectura ----------
+    def _meta(self, clave: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.dir / f"{clave}.meta").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def cabeceras_condicionales(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since para la entrada de `url` (vacío si no hay)."""
+        meta = self._meta(_clave(url))
+        if not meta or not (self.dir / f"{_clave(url)}.body").exists():
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def cuerpo(self, url: str) -> Optional[str]:
+        """Cuerpo guardado (y marca la entrada como usada para la evicción LRU)."""
+        clave = _clave(url)
+        try:
+            texto = (self.dir / f"{clave}.body").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        meta = self._meta(clave)
+        if meta:
+            meta["usado"] = time.time()
+            _escribir_atomico(self.dir / f"{clave}.meta", json.dumps(meta).encode("utf-8"))
+        return texto
+
+    def leer_derivado(self, url: str, nombre: str) -> Optional[Any]:
+        try:
+            return json.loads((self.dir / f"{_clave(url)}.{nombre}.deriv").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    # ---------- escritura ----------
+    def guardar(self, url: str, texto: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Guarda un cuerpo nuevo (200) e invalida los derivados anteriores."""
+        clave = _clave(url)
+        data = texto.encode("utf-8")
+        ahora = time.time()
+        with self._lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            for viejo in self.dir.glob(f"{clave}.*.deriv"):
+                viejo.unlink(missing_ok=True)
+            _escribir_atomico(self.dir / f"{clave}.body", data)
+            meta = {"url": url, "etag": etag, "last_modified": last_modified,
+                    "guardado": ahora, "usado": ahora, "bytes": len(data)}
+            _escribir_atomico(self.dir / f"{clave}.meta", json.dumps(meta).encode("utf-8"))
+        self.podar()
+
+    def guardar_derivado(self, url: str, nombre: str, datos: Any) -> None:
+        clave = _clave(url)
+        if not (self.dir / f"{clave}.body").exists():
+            return
+        _escribir_atomico(self.dir / f"{clave}.{nombre}.deriv",
+                          json.dumps(datos, ensure_ascii=False).encode("utf-8"))
+
+    # ---------- evicción ----------
+    def _borrar(self, clave: str) -> None:
+        for f in self.dir.glob(f"{clave}.*"):
+            f.unlink(missing_ok=True)
+
+    def podar(self) -> None:
+        """Borra entradas vencidas y, si se supera max_bytes, las menos usadas."""
+        if not self.dir.exists():
+            return
+        with self._lock:
+            ahora = time.time()
+            vivas = []
+            for meta_path in self.dir.glob("*.meta"):
+                clave = meta_path.stem
+                meta = self._meta(clave)
+                if not meta or ahora - meta.get("guardado", 0) > self.max_edad:
+                    self._borrar(clave)
+                    continue
+                vivas.append((meta.get("usado", 0), clave, meta.get("bytes", 0)))
+            total = sum(b for _, _, b in vivas)
+            for _, clave, b in sorted(vivas):
+                if total <= self.max_bytes:
+                    break
+                self._borrar(clave)
+                total -= b
@@ -1,42 +1,36 @@
 # cargar_eventos.py — Inserta todas las fuentes en la tabla 'evento' (DB: QueHayPaHacer)
 import re
+import hashlib
 import json
+import queue
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import requests
-import psycopg2
+from psycopg2.extensions import cursor as Cursor
+from psycopg2.extras import execute_values
 
-# ===================== Configuración BD =====================
-DB_CONFIG = {
-    "host": "awsaurorapg17-instance-1.cav2004g2f8p.us-east-1.rds.amazonaws.com",
-    "port": "5432",
-    "dbname": "QueHayPaHacer",
-    "user": "postgres",
-    "password": "postgres",
-}
+from db import DB_CONFIG, POOL_MAX, conexion, ejecutar_preparada, etiquetas_enum, tipos_columnas
+from descargas import descargar
+from fuentes import ruta_archivo, seleccionar
+import metricas_corrida
+from dedup_difuso import IndiceDifuso
+from indice_cambios import IndiceCambios, hash_fila
+from salida_eventos import leer_ndjson, ruta_salida
 
 # ===================== Rutas / Fuentes ======================
 BASE_DIR = Path(__file__).resolve().parent
 FRESH_HOURS = 6  # horas de "frescura" del JSON local
+TAM_LOTE = 5000  # filas por execute_values al leer fuentes en streaming (memoria acotada)
 
+# Derivadas del registro único (fuentes.py): mismas claves que usa Main.py
 FUENTES = {
-    "idartes": {
-        "archivo": str(BASE_DIR / "scraping_idartes.json"),
-        "url": "https://raw.githubusercontent.com/ZValentinaF/Proyecto-Integrador-scrapings/main/scraping_idartes.json",
-        "ciudad": "Bogotá",
-    },
-    "pablobon": {
-        "archivo": str(BASE_DIR / "scraping_teatropablotobon.json"),
-        "url": "https://raw.githubusercontent.com/ZValentinaF/Proyecto-Integrador-scrapings/main/scraping_teatropablotobon.json",
-        "ciudad": "Medellín",
-    },
-    "plaza": {
-        "archivo": str(BASE_DIR / "scraping_teatroplasa.json"),
-        "url": "https://raw.githubusercontent.com/ZValentinaF/Proyecto-Integrador-scrapings/main/scraping_teatroplasa.json",
-        "ciudad": "Cali",
-    },
+    decl["clave"]: {"archivo": ruta_archivo(decl), "url": decl["publicado"], "ciudad": decl["ciudad"]}
+    for decl in seleccionar()
 }
 
 # ===================== Utilidades JSON / lectura =====================
@@ -61,8 +55,19 @@ def es_fresco(path: str, horas: int = FRESH_HOURS) -> bool:
     return edad_horas <= horas
 
 def leer_eventos(cfg: dict):
+    """
+    Devuelve los eventos de la fuente:
+      - NDJSON local fresco (el más reciente si también hay .json) → generador, memoria acotada
+      - JSON local fresco → lista
+      - si no, descarga el JSON publicado (url)
+    """
     archivo = cfg.get("archivo")
     url = cfg.get("url")
+    ndjson = ruta_salida(archivo, "ndjson") if archivo else None
+
+    if ndjson and es_fresco(ndjson):
+        if not (es_fresco(archivo) and Path(archivo).stat().st_mtime > Path(ndjson).stat().st_mtime):
+            return leer_ndjson(ndjson)
 
     if archivo and es_fresco(archivo):
         with open(archivo, "r", encoding="utf-8") as f:
@@ -74,9 +79,7 @@ def leer_eventos(cfg: dict):
             return ast.literal_eval(txt)
 
     if url:
-        r = requests.get(url, timeout=20)
-        r.raise_for_status()
-        data = r.json()
+        data = json.loads(descargar(url))
         if archivo:
             try:
                 with open(archivo, "w", encoding="utf-8") as f:
@@ -98,38 +101,30 @@ def obtener_fecha_inicio(ev: dict):
         return f
     return None
 
-def es_valido(ev: dict) -> bool:
-    return bool(ev.get("nombre")) and obtener_fecha_inicio(ev) is not None
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+# Si 'ingreso' contiene alguna, el evento es gratuito (precio 0); si no ("costo",
+# "$", "boleta", "entrada"…), de pago pero sin precio confiable.
+MARCAS_GRATIS = ("libre", "gratuito")
 
-def inferir_es_gratuito_y_precio(ev: dict):
-    ingreso_raw = str(ev.get("ingreso", "")).lower()
-    if "libre" in ingreso_raw or "gratuito" in ingreso_raw:
-        return True, 0.0
-    if any(x in ingreso_raw for x in ["costo", "$", "bole", "entrada"]):
-        return False, None
-    return False, None
-
-def slugify(texto: str) -> str:
-    s = re.sub(r"[^a-z0-9]+", "-", (texto or "").lower()).strip("-")
-    return s[:60] if s else None
+def slugify(texto) -> Optional[str]:
+    t = str(texto or "")
+    s = SLUG_RE.sub("-", t.lower()).strip("-")
+    if s:
+        return s[:60]
+    # Sin letras ni dígitos ASCII (solo emojis, otra escritura…): slug por hash del
+    # título, para que INDICE_DEDUP también lo cubra (un slug NULL nunca choca)
+    return "t-" + hashlib.md5(t.encode("utf-8")).hexdigest()[:16] if t else None
 
 # ===================== ENUM: estadoeventoenum =====================
 def obtener_estado_valido(conn) -> str:
     """
-    Lee las etiquetas válidas del ENUM estadoeventoenum y retorna la mejor opción:
+    Lee las etiquetas válidas del ENUM estadoeventoenum (cacheadas por proceso
+    en db.etiquetas_enum) y retorna la mejor opción:
     - Prefiere 'ACTIVO' si existe,
     - si no, 'PUBLICADO' si existe,
     - si no, la primera etiqueta del ENUM.
     """
-    with conn.cursor() as c:
-        c.execute("""
-            SELECT e.enumlabel
-            FROM pg_type t
-            JOIN pg_enum e ON t.oid = e.enumtypid
-            WHERE t.typname = 'estadoeventoenum'
-            ORDER BY e.enumsortorder;
-        """)
-        rows = [r[0] for r in c.fetchall()]
+    rows = etiquetas_enum(conn, "estadoeventoenum")
     if not rows:
         # Fallback duro (no debería pasar si la columna es ENUM correcto)
         return 'ACTIVO'
@@ -139,83 +134,634 @@ def obtener_estado_valido(conn) -> str:
             return p
     return rows[0]  # primer valor del enum
 
-# ===================== Carga principal =====================
-def cargar_datos():
-    conn = None
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-        print(f"✅ Conexión establecida con la base '{DB_CONFIG['dbname']}'")
+# ===================== Filas / SQL =====================
+COLUMNAS_EVENTO = (
+    "titulo", "descripcion", "estado", "imagen_url", "organizador_id", "lugar_id",
+    "url_oficial", "es_gratuito", "precio_desde", "moneda", "slug", "fecha_publicacion",
+)
+
+class Normalizador:
+    """
+    Validación + normalización de una carga: el estado del ENUM queda fijo y cada
+    evento crudo se convierte en su tupla de COLUMNAS_EVENTO (lista para
+    execute_values) en una sola pasada, leyendo cada campo una vez. Un evento es
+    válido si tiene nombre y fecha de inicio; si no, fila() devuelve None.
+    """
+    __slots__ = ("estado",)
+
+    def __init__(self, estado: str):
+        self.estado = estado
+
+    def fila(self, ev: dict) -> Optional[tuple]:
+        titulo = ev.get("nombre")
+        if not titulo:
+            return None
+        fecha = obtener_fecha_inicio(ev)  # se envía como string 'YYYY-MM-DD'
+        if fecha is None:
+            return None
+        ingreso = str(ev.get("ingreso", "")).lower()
+        gratis = any(m in ingreso for m in MARCAS_GRATIS)
+        return (
+            titulo, ev.get("tipo", "Sin descripción"), self.estado, None, None, None, ev.get("url"),
+            gratis, 0.0 if gratis else None, "COP", slugify(titulo), fecha,
+        )
+
+class MuestraInvalidos:
+    """
+    Muestreo de reservorio (algoritmo R): guarda a lo sumo `k` eventos inválidos,
+    elegidos al azar con igual probabilidad entre todos los vistos, sin retener
+    el resto (memoria constante aunque la fuente tenga millones de inválidos).
+    """
+    __slots__ = ("k", "vistos", "ejemplos", "_azar")
+
+    def __init__(self, k: int = 3, semilla: Optional[int] = None):
+        self.k = k
+        self.vistos = 0
+        self.ejemplos: List[dict] = []
+        self._azar = random.Random(semilla)
+
+    def agregar(self, ev: dict) -> None:
+        self.vistos += 1
+        if len(self.ejemplos) < self.k:
+            self.ejemplos.append(ev)
+        else:
+            i = self._azar.randrange(self.vistos)
+            if i < self.k:
+                self.ejemplos[i] = ev
+
+# Columnas que se refrescan cuando un evento ya cargado cambió de contenido
+# (el estado lo administra la aplicación, no se toca).
+COLUMNAS_ACTUALIZABLES = ("descripcion", "url_oficial", "es_gratuito", "precio_desde", "moneda", "slug")
+
+def tipos_evento(cur, columnas) -> list:
+    """Tipos SQL de las columnas de 'evento' (catálogo cacheado) para firmar los PREPARE."""
+    tipos = tipos_columnas(cur.connection, "evento")
+    return [tipos[c] for c in columnas]
+
+def actualizar_fila(cur, fila: tuple) -> int:
+    """UPDATE del evento (titulo, fecha_publicacion) si su contenido cambió. Devuelve filas tocadas."""
+    valores = tuple(fila[COLUMNAS_EVENTO.index(c)] for c in COLUMNAS_ACTUALIZABLES)
+    n = len(COLUMNAS_ACTUALIZABLES)
+    sets = ", ".join(f"{c} = ${i}" for i, c in enumerate(COLUMNAS_ACTUALIZABLES, start=1))
+    ejecutar_preparada(cur, "actualizar_evento", f"""
+        UPDATE evento SET {sets}
+        WHERE titulo = ${n + 1} AND fecha_publicacion = ${n + 2}
+          AND ({", ".join(COLUMNAS_ACTUALIZABLES)})
+              IS DISTINCT FROM ({", ".join(f"${i}" for i in range(1, n + 1))})
+    """, valores + (fila[0], fila[-1]),
+        tipos_evento(cur, COLUMNAS_ACTUALIZABLES + ("titulo", "fecha_publicacion")))
+    return cur.rowcount
+
+def insertar_fila(cur, fila: tuple, con_indice: bool = False) -> int:
+    """
+    Modo 'fila': un INSERT (preparado una vez por conexión) por evento. Devuelve 1 si insertó, 0 si ya existía.
+    con_indice=True → ya existe INDICE_DEDUP (migrar_dedup): un choque de (slug, fecha) se omite en vez de
+    abortar la transacción de la fuente.
+    """
+    # Evitar duplicados sin requerir UNIQUE: usa (titulo, fecha_publicacion)
+    n = len(COLUMNAS_EVENTO)
+    conflicto = f"ON CONFLICT ({', '.join(CLAVE_DEDUP)}) DO NOTHING" if con_indice else ""
+    ejecutar_preparada(cur, "insertar_evento_dedup" if con_indice else "insertar_evento", f"""
+        INSERT INTO evento ({", ".join(COLUMNAS_EVENTO)})
+        SELECT {", ".join(f"${i}" for i in range(1, n + 1))}
+        WHERE NOT EXISTS (
+            SELECT 1 FROM evento e
+            WHERE e.titulo = $1
+              AND e.fecha_publicacion = ${n}
+        )
+        {conflicto}
+    """, fila, tipos_evento(cur, COLUMNAS_EVENTO))
+    return cur.rowcount
+
+def preparar_staging(cur) -> None:
+    """
+    Tabla temporal con los mismos tipos de 'evento' (incluye el ENUM de estado).
+    ON COMMIT DELETE ROWS: queda vacía después de cada commit por fuente.
+    """
+    cols = ", ".join(COLUMNAS_EVENTO)
+    cur.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS evento_staging
+        ON COMMIT DELETE ROWS
+        AS SELECT {cols} FROM evento WITH NO DATA;
+    """)
 
-        estado_enum_seguro = obtener_estado_valido(conn)
+# Las fuentes cargadas en paralelo no ven las filas sin confirmar de las otras:
+# NOT EXISTS dejaría pasar el mismo evento dos veces. Este candado de asesoría
+# (se libera con el commit) serializa el merge y deja en paralelo solo la lectura
+# y el envío a staging.
+CANDADO_CARGA = 0x45564E54  # "EVNT"
 
-        for fuente, cfg in FUENTES.items():
-            print(f"\n📥 Cargando {fuente} → evento")
+def candado_escritura(cur) -> None:
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (CANDADO_CARGA,))
+
+class CursorCronometrado(Cursor):
+    """
+    Cursor que suma en `segundos` lo que tarda cada execute (también los de
+    execute_values y ejecutar_preparada): el tiempo de BD medido en los round
+    trips, aunque la validación corra a la vez en el hilo de adelantar().
+    """
+    segundos = 0.0
+
+    def execute(self, query, vars=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self.segundos += time.perf_counter() - t0
+
+def en_trozos(items: Iterable, tam: int) -> Iterator[list]:
+    trozo = []
+    for it in items:
+        trozo.append(it)
+        if len(trozo) >= tam:
+            yield trozo
+            trozo = []
+    if trozo:
+        yield trozo
+
+def adelantar(items: Iterable, max_pendientes: int = 2) -> Iterator:
+    """
+    Consume `items` en un hilo aparte y deja hasta `max_pendientes` elementos listos:
+    mientras se escribe un trozo en la BD, el siguiente ya se está leyendo y validando.
+    """
+    canal: "queue.Queue" = queue.Queue(maxsize=max_pendientes)
+    fin, parar = object(), threading.Event()
+
+    def poner(item) -> bool:
+        while not parar.is_set():
             try:
-                eventos = leer_eventos(cfg)
-            except Exception as e:
-                print(f"   ❌ Error leyendo datos: {e}")
+                canal.put(item, timeout=0.1)
+                return True
+            except queue.Full:
                 continue
+        return False
 
-            if not isinstance(eventos, list):
-                eventos = [eventos]
-
-            validos = [ev for ev in eventos if es_valido(ev)]
-            invalidos = [ev for ev in eventos if not es_valido(ev)]
-
-            print(f"   → {len(eventos)} eventos encontrados")
-            print(f"   ✅ Válidos: {len(validos)}")
-            print(f"   ❌ Inválidos: {len(invalidos)}")
-            if invalidos:
-                print("   Ejemplos de inválidos:")
-                for ejemplo in invalidos[:3]:
-                    print(f"   - {ejemplo}")
-
-            for ev in validos:
-                titulo = ev.get("nombre", "Evento sin título")
-                descripcion = ev.get("tipo", "Sin descripción")
-                estado = estado_enum_seguro
-                imagen_url = None
-                url_oficial = ev.get("url", None)
-                es_gratuito, precio_desde = inferir_es_gratuito_y_precio(ev)
-                moneda = "COP"
-                slug = slugify(titulo)
-                fecha_pub = obtener_fecha_inicio(ev)  # se envía como string 'YYYY-MM-DD'
-
-                # Evitar duplicados sin requerir UNIQUE: usa (titulo, fecha_publicacion)
-                cur.execute("""
-                    INSERT INTO evento 
-                    (titulo, descripcion, estado, imagen_url, organizador_id, lugar_id,
-                     url_oficial, es_gratuito, precio_desde, moneda, slug, fecha_publicacion)
-                    SELECT %s, %s, %s, %s, NULL, NULL, %s, %s, %s, %s, %s, %s
-                    WHERE NOT EXISTS (
-                        SELECT 1 FROM evento e
-                        WHERE e.titulo = %s
-                          AND e.fecha_publicacion = %s
-                    );
-                """, (
-                    titulo, descripcion, estado, imagen_url,
-                    url_oficial, es_gratuito, precio_desde, moneda, slug, fecha_pub,
-                    titulo, fecha_pub
-                ))
+    def productor():
+        try:
+            for it in items:
+                if not poner(("ok", it)):
+                    return
+            poner(("ok", fin))
+        except BaseException as e:
+            poner(("error", e))
 
-            conn.commit()
+    threading.Thread(target=productor, daemon=True).start()
+    try:
+        while True:
+            tipo, it = canal.get()
+            if tipo == "error":
+                raise it
+            if it is fin:
+                return
+            yield it
+    finally:
+        parar.set()
 
-        print("\n🎉 Datos cargados correctamente en 'evento'.")
-        cur.close()
-        conn.close()
+def insertar_lote(cur, filas: Iterable[tuple], actualizar: bool = False,
+                  con_indice: bool = False, serializar: bool = False) -> Tuple[int, int, int]:
+    """
+    Modo 'lote': envía las filas de la fuente a evento_staging con execute_values
+    (un INSERT por cada TAM_LOTE filas) y las fusiona en 'evento' con un único
+    INSERT … SELECT. `filas` puede ser un generador: nunca se arma la lista entera.
+    actualizar=True (carga incremental) además refresca con un UPDATE … FROM los
+    eventos ya existentes cuyo contenido cambió.
+    con_indice=True → ya existe INDICE_DEDUP: el merge deja un evento por
+    (slug, fecha) y omite con ON CONFLICT los que chocan con filas ya cargadas.
+    serializar=True (carga en paralelo) → el merge espera el candado de escritura.
+    Devuelve (filas enviadas, insertadas, actualizadas).
+    """
+    cols = ", ".join(COLUMNAS_EVENTO)
+    enviadas = 0
+    for trozo in adelantar(en_trozos(filas, TAM_LOTE)):
+        execute_values(
+            cur,
+            f"INSERT INTO evento_staging ({cols}) VALUES %s",
+            trozo,
+            page_size=len(trozo),
+        )
+        enviadas += len(trozo)
+    if not enviadas:
+        return 0, 0, 0
 
-    except Exception as e:
-        print("❌ Error general al cargar datos:", e)
-        if conn:
-            try:
-                conn.rollback()
-            except Exception:
-                pass
+    if serializar:
+        candado_escritura(cur)
+    actualizadas = 0
+    if actualizar:
+        sets = ", ".join(f"{c} = s.{c}" for c in COLUMNAS_ACTUALIZABLES)
+        cur.execute(f"""
+            UPDATE evento e SET {sets}
+            FROM (
+                SELECT DISTINCT ON (titulo, fecha_publicacion) *
+                FROM evento_staging
+                ORDER BY titulo, fecha_publicacion
+            ) s
+            WHERE e.titulo = s.titulo
+              AND e.fecha_publicacion = s.fecha_publicacion
+              AND ({", ".join("e." + c for c in COLUMNAS_ACTUALIZABLES)})
+                  IS DISTINCT FROM ({", ".join("s." + c for c in COLUMNAS_ACTUALIZABLES)});
+        """)
+        actualizadas = cur.rowcount
+    # DISTINCT ON elimina repetidos dentro del mismo lote; NOT EXISTS, los ya cargados.
+    # Con el índice único la clave es la de INDICE_DEDUP ("Hamlet" y "HAMLET!" chocan);
+    # una fila sin slug (solo con título vacío) no choca y se distingue por título.
+    if con_indice:
+        clave, conflicto = "COALESCE(s.slug, s.titulo), s.fecha_publicacion", \
+            f"ON CONFLICT ({', '.join(CLAVE_DEDUP)}) DO NOTHING"
+    else:
+        clave, conflicto = "s.titulo, s.fecha_publicacion", ""
+    cur.execute(f"""
+        INSERT INTO evento ({cols})
+        SELECT DISTINCT ON ({clave}) {", ".join("s." + c for c in COLUMNAS_EVENTO)}
+        FROM evento_staging s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM evento e
+            WHERE e.titulo = s.titulo
+              AND e.fecha_publicacion = s.fecha_publicacion
+        )
+        ORDER BY {clave}
+        {conflicto};
+    """)
+    return enviadas, cur.rowcount, actualizadas
+
+# ===================== Deduplicación en el servidor (modo 'upsert') =====================
+# Clave normalizada: el slug (título sin mayúsculas/tildes/símbolos) + la fecha.
+# 'evento' no guarda la fuente, así que la clave es global como la de NOT EXISTS.
+INDICE_DEDUP = "evento_dedup_uq"
+CLAVE_DEDUP = ("slug", "fecha_publicacion")
+def slug_sql(titulo: str = "titulo") -> str:
+    """slugify() en SQL, para rellenar filas que no traen slug (cargadas por otros medios o antes del hash)."""
+    return (f"COALESCE(NULLIF(left(btrim(regexp_replace(lower({titulo}), '[^a-z0-9]+', '-', 'g'), '-'), 60), ''), "
+            f"'t-' || left(md5(NULLIF({titulo}, '')), 16))")
+
+def indice_dedup_existe(cur) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (INDICE_DEDUP,))
+    return cur.fetchone()[0]
+
+def slugs_pendientes(cur) -> bool:
+    """Hay eventos sin slug que podrían tenerlo (con INDICE_DEDUP, `slug IS NULL` se busca en el índice)."""
+    cur.execute(f"SELECT EXISTS (SELECT 1 FROM evento WHERE slug IS NULL AND {slug_sql()} IS NOT NULL)")
+    return cur.fetchone()[0]
+
+def migrar_dedup(conn) -> Tuple[int, int]:
+    """
+    Migración previa al modo 'upsert', en una sola transacción:
+      1. borra los eventos sin slug que repiten la clave (slug, fecha_publicacion)
+         de otro (el modo upsert los reinsertaba en cada corrida) y rellena el slug
+         de los que quedan,
+      2. si falta INDICE_DEDUP, borra los repetidos por (slug, fecha_publicacion)
+         dejando el de menor id y crea el índice.
+    Se puede volver a correr (p. ej. tras cargas con slugs NULL). Devuelve (rellenados, borrados).
+    """
+    cols = ", ".join(CLAVE_DEDUP)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DELETE FROM evento e
+            USING evento o
+            WHERE e.slug IS NULL AND o.id <> e.id
+              AND o.fecha_publicacion = e.fecha_publicacion
+              AND COALESCE(o.slug, {slug_sql("o.titulo")}) = {slug_sql("e.titulo")}
+              AND (o.slug IS NOT NULL OR o.id < e.id)
+        """)
+        borrados = cur.rowcount
+        cur.execute(f"UPDATE evento SET slug = {slug_sql()} WHERE slug IS NULL")
+        rellenados = cur.rowcount
+        if not indice_dedup_existe(cur):
+            cur.execute(f"""
+                DELETE FROM evento e
+                USING evento o
+                WHERE ({", ".join("e." + c for c in CLAVE_DEDUP)}) = ({", ".join("o." + c for c in CLAVE_DEDUP)})
+                  AND e.id > o.id
+            """)
+            borrados += cur.rowcount
+            cur.execute(f"CREATE UNIQUE INDEX {INDICE_DEDUP} ON evento ({cols})")
+    conn.commit()
+    return rellenados, borrados
+
+def sin_repetidos(trozo: List[tuple]) -> List[tuple]:
+    """
+    Primera fila por clave de dedup dentro del trozo: ON CONFLICT DO UPDATE no
+    admite dos filas del mismo INSERT con la misma clave. Las filas sin slug
+    (título vacío) no chocan en el índice (NULL) y pasan todas.
+    """
+    i_slug, i_fecha = COLUMNAS_EVENTO.index("slug"), COLUMNAS_EVENTO.index("fecha_publicacion")
+    vistas, salida = set(), []
+    for fila in trozo:
+        slug = fila[i_slug]
+        if slug is not None:
+            clave = (slug, fila[i_fecha])
+            if clave in vistas:
+                continue
+            vistas.add(clave)
+        salida.append(fila)
+    return salida
+
+def clave_dedup(fila: tuple) -> tuple:
+    """Orden de inserción del upsert en paralelo (una fila sin slug no choca: da igual dónde quede)."""
+    return tuple(fila[COLUMNAS_EVENTO.index(c)] or "" for c in CLAVE_DEDUP)
+
+def upsert_lote(cur, filas: Iterable[tuple], actualizar: bool = False,
+                ordenar: bool = False) -> Tuple[int, int, int]:
+    """
+    Modo 'upsert': INSERT … ON CONFLICT contra el índice único INDICE_DEDUP, un
+    execute_values por cada TAM_LOTE filas y sin tabla de staging. Cada choque se
+    resuelve con una búsqueda en el índice (no un recorrido de 'evento' por fila).
+    actualizar=False → DO NOTHING; True → DO UPDATE solo si el contenido cambió.
+    RETURNING (xmax = 0) distingue insertadas de actualizadas.
+    ordenar=True (carga en paralelo) → toda la fuente se envía en orden de clave:
+    dos transacciones que insertan claves comunes las toman en el mismo orden y
+    una espera a la otra en vez de bloquearse mutuamente (se pierde el streaming).
+    Devuelve (filas enviadas, insertadas, actualizadas).
+    """
+    if not indice_dedup_existe(cur):
+        raise RuntimeError(f"Falta el índice único {INDICE_DEDUP}: corre "
+                           "'python cargar_eventos.py --migrar-dedup' una vez antes del modo upsert")
+    if slugs_pendientes(cur):
+        raise RuntimeError("Hay eventos sin slug: no chocan en el índice único y se reinsertarían en cada "
+                           "carga; corre 'python cargar_eventos.py --migrar-dedup' de nuevo")
+    cols = ", ".join(COLUMNAS_EVENTO)
+    if actualizar:
+        sets = ", ".join(f"{c} = excluded.{c}" for c in COLUMNAS_ACTUALIZABLES)
+        accion = f"""DO UPDATE SET {sets}
+            WHERE ({", ".join("evento." + c for c in COLUMNAS_ACTUALIZABLES)})
+                  IS DISTINCT FROM ({", ".join("excluded." + c for c in COLUMNAS_ACTUALIZABLES)})"""
+    else:
+        accion = "DO NOTHING"
+    sql = (f"INSERT INTO evento ({cols}) VALUES %s "
+           f"ON CONFLICT ({', '.join(CLAVE_DEDUP)}) {accion} RETURNING (xmax = 0)")
+    enviadas = insertadas = actualizadas = 0
+    if ordenar:
+        filas = sorted(filas, key=clave_dedup)
+    for trozo in adelantar(en_trozos(filas, TAM_LOTE)):
+        enviadas += len(trozo)
+        trozo = sin_repetidos(trozo)
+        for (nueva,) in execute_values(cur, sql, trozo, page_size=len(trozo), fetch=True):
+            if nueva:
+                insertadas += 1
+            else:
+                actualizadas += 1
+    return enviadas, insertadas, actualizadas
+
+# ===================== Repetidos entre fuentes (difuso) =====================
+def _vacio(v) -> bool:
+    return v is None or v == "" or v == "N/A"
+
+def fusionar_entre_fuentes(eventos_por_fuente: Dict[str, list],
+                           ciudades: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, list], Dict[str, int]]:
+    """
+    Busca el mismo evento publicado por varias fuentes de la misma ciudad con
+    títulos parecidos (dedup_difuso.IndiceDifuso: MinHash/LSH por ciudad y fecha,
+    sin comparar todo contra todo) y deja uno por grupo: el de la primera fuente
+    en el orden de FUENTES, completando sus campos vacíos con los de los repetidos.
+    ciudades: fuente → ciudad (None = la de FUENTES; una fuente sin ciudad conocida
+    se compara con las demás sin ciudad).
+    Devuelve (eventos por fuente sin los repetidos, descartados por fuente).
+    """
+    if ciudades is None:
+        ciudades = {f: cfg["ciudad"] for f, cfg in FUENTES.items()}
+    indice = IndiceDifuso()
+    for fuente, eventos in eventos_por_fuente.items():
+        ciudad = ciudades.get(fuente)
+        for i, ev in enumerate(eventos):
+            if isinstance(ev, dict):
+                indice.agregar((fuente, i), fuente, obtener_fecha_inicio(ev), ev.get("nombre") or "", ciudad)
+
+    descartar: Dict[str, set] = {f: set() for f in eventos_por_fuente}
+    salida = {f: list(evs) for f, evs in eventos_por_fuente.items()}
+    for grupo in indice.grupos():
+        (f0, i0), resto = grupo[0], grupo[1:]
+        base = dict(salida[f0][i0])
+        for f, i in resto:
+            if f == f0:
+                continue  # mismo origen: lo resuelve la clave exacta de la BD
+            for k, v in salida[f][i].items():
+                if _vacio(base.get(k)) and not _vacio(v):
+                    base[k] = v
+            descartar[f].add(i)
+        salida[f0][i0] = base
+    for f, indices in descartar.items():
+        if indices:
+            salida[f] = [ev for i, ev in enumerate(salida[f]) if i not in indices]
+    return salida, {f: len(i) for f, i in descartar.items()}
+
+# ===================== Carga principal =====================
+MODOS_CARGA = ("lote", "fila", "upsert")
+EJEMPLOS_INVALIDOS = 3  # inválidos que se muestran por fuente (muestra de reservorio)
+_print_lock = threading.Lock()
+
+def emitir(lineas: List[str]) -> None:
+    """Imprime el reporte de una fuente de una sola vez (las fuentes corren en paralelo)."""
+    with _print_lock:
+        print("\n".join(lineas))
+
+def cargar_datos(modo: str = "lote", eventos_por_fuente: Optional[Dict[str, list]] = None,
+                 incremental: bool = False, paralelo: bool = False,
+                 fuentes: Optional[Iterable[str]] = None, dedup_difuso: bool = False) -> bool:
+    """
+    Carga todas las FUENTES en 'evento'.
+    modo='lote' → 2 round trips por fuente (staging + merge).
+    modo='fila' → un INSERT … WHERE NOT EXISTS por evento (comportamiento original).
+    modo='upsert' → INSERT … ON CONFLICT en lotes sobre el índice único de
+    (slug, fecha_publicacion); requiere haber corrido migrar_dedup una vez.
+    eventos_por_fuente: listas ya scrapeadas en memoria (p. ej. Main.py --in-process);
+    las fuentes que no aparezcan se leen con leer_eventos().
+    incremental=True → consulta el índice local (indice_cambios): los eventos cuyo
+    hash no cambió desde la última carga ni se envían; los nuevos o modificados se
+    insertan/actualizan y el índice se confirma tras el commit de cada fuente.
+    paralelo=True → cada fuente en su hilo, con su conexión del pool y su transacción:
+    lecturas/descargas se solapan. Para no perder el dedup entre fuentes, en 'lote'
+    y 'fila' la escritura en 'evento' se serializa con un candado de asesoría; en
+    'upsert' el índice único resuelve los choques y cada fuente inserta en orden de clave.
+    fuentes: subconjunto de FUENTES a cargar (None = todas).
+    dedup_difuso=True → antes de escribir, lee todas las fuentes en memoria y
+    fusiona los eventos casi repetidos entre fuentes (fusionar_entre_fuentes);
+    se pierde la lectura en streaming del NDJSON.
+    Devuelve True si ninguna fuente falló al escribir en la BD.
+    """
+    eventos_por_fuente = eventos_por_fuente or {}
+    if modo not in MODOS_CARGA:
+        raise ValueError(f"Modo de carga desconocido: {modo!r} (usa {', '.join(MODOS_CARGA)})")
+
+    seleccion = set(FUENTES) if fuentes is None else set(fuentes)
+    if seleccion - set(FUENTES):
+        raise ValueError(f"Fuentes desconocidas: {', '.join(sorted(seleccion - set(FUENTES)))}")
+    indice = IndiceCambios() if incremental else None
+    fuentes = [(f, cfg) for f, cfg in FUENTES.items() if f in seleccion]
+    print(f"✅ Cargando {len(fuentes)} fuentes en la base '{DB_CONFIG['dbname']}' "
+          + ("en paralelo" if paralelo else "en secuencia"))
+
+    if dedup_difuso:
+        leidos = {}
+        for fuente, cfg in fuentes:
+            eventos = eventos_por_fuente.get(fuente)
             try:
-                conn.close()
+                eventos = leer_eventos(cfg) if eventos is None else eventos
             except Exception:
-                pass
+                continue  # cargar_fuente reintenta la lectura y reporta el error
+            leidos[fuente] = [eventos] if isinstance(eventos, dict) else list(eventos)
+        t0 = time.perf_counter()
+        leidos, descartados = fusionar_entre_fuentes(leidos)
+        print(f"🔗 Repetidos entre fuentes fusionados: {sum(descartados.values())} "
+              f"({time.perf_counter() - t0:.2f}s)")
+        for fuente, n in descartados.items():
+            metricas_corrida.sumar(fuente, "eventos_fusionados", n)
+        eventos_por_fuente = {**eventos_por_fuente, **leidos}
+
+    def una(item) -> bool:
+        fuente, cfg = item
+        return cargar_fuente(fuente, cfg, modo, eventos_por_fuente.get(fuente), indice, paralelo)
+
+    if paralelo:
+        with ThreadPoolExecutor(max_workers=min(len(fuentes), POOL_MAX)) as ex:
+            resultados = list(ex.map(una, fuentes))
+    else:
+        resultados = [una(item) for item in fuentes]
+
+    if all(resultados):
+        print("\n🎉 Datos cargados correctamente en 'evento'.")
+        return True
+    print(f"\n❌ {resultados.count(False)} fuente(s) con error al cargar en 'evento'.")
+    return False
+
+def cargar_fuente(fuente: str, cfg: dict, modo: str, eventos: Optional[Iterable],
+                  indice: Optional[IndiceCambios], paralelo: bool = False) -> bool:
+    """
+    Lee, valida y escribe una fuente en su propia transacción, sobre una conexión
+    prestada por el pool. Devuelve False solo si falló la escritura en la BD.
+    """
+    incremental = indice is not None
+    log = [f"\n📥 Cargando {fuente} → evento"]
+    try:
+        if eventos is None:
+            eventos = leer_eventos(cfg)
+    except Exception as e:
+        log.append(f"   ❌ Error leyendo datos: {e}")
+        emitir(log)
+        return True
+
+    if isinstance(eventos, dict):
+        eventos = [eventos]
+
+    # Una sola pasada: sirve igual para listas y para el generador NDJSON
+    conteo = {"total": 0, "validos": 0, "invalidos": 0, "sin_cambios": 0}
+    muestra = MuestraInvalidos(EJEMPLOS_INVALIDOS)
+    conocidos = indice.hashes(fuente) if indice else {}
+    por_confirmar: List[Tuple[str, str]] = []
+
+    # Segundos de validar/normalizar: con el Normalizador ambas son un solo paso;
+    # 'validar' acumula lo gastado en eventos descartados y 'normalizar' lo gastado
+    # en los válidos. Se solapan con la escritura (adelantar), así que 'bd' no sale
+    # de restar: lo miden CursorCronometrado y el commit.
+    seg = {"validar": 0.0, "normalizar": 0.0, "bd": 0.0}
+    reloj = time.perf_counter
+
+    def filas_validas(estado: str):
+        fila_de = Normalizador(estado).fila
+        for ev in eventos:
+            conteo["total"] += 1
+            t0 = reloj()
+            fila = fila_de(ev)
+            if fila is None:
+                seg["validar"] += reloj() - t0
+                conteo["invalidos"] += 1
+                muestra.agregar(ev)
+                continue
+            seg["normalizar"] += reloj() - t0
+            conteo["validos"] += 1
+            if indice:
+                clave, h = IndiceCambios.clave(fila[0], fila[-1]), hash_fila(fila)
+                if conocidos.get(clave) == h:
+                    conteo["sin_cambios"] += 1
+                    continue
+                por_confirmar.append((clave, h))
+            yield fila
+
+    try:
+        with conexion() as conn:
+            with conn.cursor(cursor_factory=CursorCronometrado) as cur:
+                estado_enum_seguro = obtener_estado_valido(conn)
+                con_indice = modo != "upsert" and indice_dedup_existe(cur)
+                if modo == "lote":
+                    preparar_staging(cur)
+                    enviadas, insertados, actualizados = insertar_lote(
+                        cur, filas_validas(estado_enum_seguro), actualizar=incremental, con_indice=con_indice,
+                        serializar=paralelo)
+                elif modo == "upsert":
+                    enviadas, insertados, actualizados = upsert_lote(
+                        cur, filas_validas(estado_enum_seguro), actualizar=incremental, ordenar=paralelo)
+                else:
+                    if paralelo:
+                        candado_escritura(cur)
+                    enviadas = insertados = actualizados = 0
+                    for fila in filas_validas(estado_enum_seguro):
+                        enviadas += 1
+                        if incremental:
+                            actualizados += actualizar_fila(cur, fila)
+                        insertados += insertar_fila(cur, fila, con_indice)
+            t0 = reloj()
+            conn.commit()
+            seg["bd"] += cur.segundos + reloj() - t0
+    except Exception as e:
+        log.append(f"   ❌ Error cargando {fuente} (transacción revertida): {e}")
+        emitir(log)
+        metricas_corrida.sumar(fuente, "errores_bd")
+        return False
+
+    for etapa, segundos in seg.items():
+        metricas_corrida.tiempo(fuente, etapa, segundos)
+    for clave, n in (("eventos_validos", conteo["validos"]), ("eventos_invalidos", conteo["invalidos"]),
+                     ("eventos_sin_cambios", conteo["sin_cambios"]), ("eventos_insertados", insertados),
+                     ("eventos_actualizados", actualizados)):
+        metricas_corrida.sumar(fuente, clave, n)
+
+    if indice:
+        indice.confirmar(fuente, por_confirmar)
+    log.append(f"   → {conteo['total']} eventos encontrados")
+    log.append(f"   ✅ Válidos: {conteo['validos']}")
+    log.append(f"   ❌ Inválidos: {conteo['invalidos']}")
+    if muestra.ejemplos:
+        log.append("   Ejemplos de inválidos (muestra al azar):")
+        for ejemplo in muestra.ejemplos:
+            log.append(f"   - {ejemplo}")
+    if indice:
+        log.append(f"   💤 Sin cambios desde la última carga (no enviados): {conteo['sin_cambios']}")
+        log.append(f"   🆕 Insertados: {insertados} | 🔄 Actualizados: {actualizados} | "
+                   f"⏭️ Omitidos (ya existían): {enviadas - insertados - actualizados}")
+    else:
+        log.append(f"   🆕 Insertados: {insertados} | ⏭️ Omitidos (ya existían): {enviadas - insertados}")
+    emitir(log)
+    return True
 
 if __name__ == "__main__":
-    cargar_datos()
+    import argparse
+    import sys
+
+    ap = argparse.ArgumentParser(description="Carga las fuentes scrapeadas en la tabla 'evento'.")
+    ap.add_argument("--modo", choices=MODOS_CARGA, default="lote",
+                    help="lote: staging + merge por fuente; fila: un INSERT por evento; "
+                         "upsert: INSERT … ON CONFLICT sobre el índice único (ver --migrar-dedup)")
+    ap.add_argument("--migrar-dedup", action="store_true",
+                    help=f"Migración del modo upsert: rellena slugs, borra repetidos por (slug, fecha) y crea "
+                         f"{INDICE_DEDUP}; se puede volver a correr")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Solo envía eventos nuevos o modificados según el índice local de hashes")
+    ap.add_argument("--reiniciar-indice", action="store_true",
+                    help="Vacía el índice local antes de cargar (p. ej. si se recreó la tabla 'evento')")
+    ap.add_argument("--fuentes", type=str, default=None,
+                    help=f"Solo estas fuentes, separadas por coma ({', '.join(FUENTES)})")
+    ap.add_argument("--dedup-difuso", action="store_true",
+                    help="Fusiona eventos casi repetidos entre fuentes (misma ciudad y fecha, títulos parecidos) antes de cargar")
+    ap.add_argument("--paralelo", action="store_true",
+                    help="Carga las fuentes en paralelo, una conexión cada una (la escritura se serializa "
+                         "salvo en modo upsert)")
+    args = ap.parse_args()
+    if args.reiniciar_indice:
+        IndiceCambios().olvidar()
+    if args.migrar_dedup:
+        with conexion() as conn:
+            rellenados, borrados = migrar_dedup(conn)
+        print(f"✅ Índice {INDICE_DEDUP} listo (slugs rellenados: {rellenados}, repetidos borrados: {borrados})")
+    ok = cargar_datos(modo=args.modo, incremental=args.incremental, paralelo=args.paralelo,
+                      dedup_difuso=args.dedup_difuso,
+                      fuentes=[d["clave"] for d in seleccionar(args.fuentes)] if args.fuentes else None)
+    # Main.run_loader lee el código de salida: sin esto una BD caída se reportaría como OK
+    sys.exit(0 if ok else 1)
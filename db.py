@@ -0,0 +1,158 @@
+# db.py — Acceso compartido a la BD (QueHayPaHacer): pool de conexiones, sentencias preparadas y caché de catálogo
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, Sequence, Set, Tuple
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+DB_CONFIG = {
+    "host": "awsaurorapg17-instance-1.cav2004g2f8p.us-east-1.rds.amazonaws.com",
+    "port": "5432",
+    "dbname": "QueHayPaHacer",
+    "user": "postgres",
+    "password": "postgres",
+}
+
+# Se abre POOL_MIN conexión al crear el pool (una corrida secuencial no necesita
+# más) y crece a demanda hasta POOL_MAX; ver PoolConexiones.
+POOL_MIN = 1
+POOL_MAX = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Catálogo (pg_enum, tipos de columnas): no cambia durante la vida del proceso
+_catalogo: Dict[Tuple[str, str], tuple] = {}
+_catalogo_lock = threading.Lock()
+
+# Sentencias preparadas por conexión → nombres ya PREPARE-ados. Referencia débil:
+# la entrada desaparece con la conexión y un id() reciclado no hereda nombres.
+_preparadas: "weakref.WeakKeyDictionary[psycopg2.extensions.connection, Set[str]]" = weakref.WeakKeyDictionary()
+_preparadas_lock = threading.Lock()
+
+
+# ===================== Pool =====================
+class PoolConexiones(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool que conserva las conexiones devueltas hasta maxconn.
+    El original cierra toda conexión devuelta con minconn ya libres, así que las
+    cargas en paralelo y el daemon volverían a pagar TLS + login en cada corrida.
+    """
+
+    def _putconn(self, conn, key=None, close=False):
+        # putconn() ya tiene el lock del pool
+        minimo, self.minconn = self.minconn, self.maxconn
+        try:
+            super()._putconn(conn, key, close)
+        finally:
+            self.minconn = minimo
+
+
+def obtener_pool() -> PoolConexiones:
+    """Pool único por proceso; se crea en el primer uso (TLS + login una sola vez por conexión)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = PoolConexiones(POOL_MIN, POOL_MAX, **DB_CONFIG)
+        return _pool
+
+
+@contextmanager
+def conexion() -> Iterator["psycopg2.extensions.connection"]:
+    """
+    Presta una conexión del pool. Si el bloque lanza, hace rollback; las
+    conexiones rotas se descartan en lugar de volver al pool.
+    """
+    pool = obtener_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+        if conn.closed:  # rota, o el pool la cerró al devolverla
+            with _preparadas_lock:
+                _preparadas.pop(conn, None)
+
+
+def cerrar_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+    with _preparadas_lock:
+        _preparadas.clear()
+
+
+# ===================== Sentencias preparadas =====================
+def ejecutar_preparada(cur, nombre: str, sql: str, params: Sequence, tipos: Sequence[str] = ()) -> None:
+    """
+    PREPARE `nombre` la primera vez que se usa en esta conexión y después solo
+    EXECUTE: el servidor no vuelve a parsear/planificar la sentencia.
+    `sql` usa $1..$n; `tipos` fija el tipo de cada parámetro cuando no se puede inferir.
+    """
+    with _preparadas_lock:
+        hechas = _preparadas.setdefault(cur.connection, set())
+        nueva = nombre not in hechas
+    if nueva:
+        firma = f" ({', '.join(tipos)})" if tipos else ""
+        cur.execute(f"PREPARE {nombre}{firma} AS {sql}")
+        with _preparadas_lock:
+            hechas.add(nombre)
+    marcadores = ", ".join(["%s"] * len(params))
+    cur.execute(f"EXECUTE {nombre} ({marcadores})" if params else f"EXECUTE {nombre}", tuple(params))
+
+
+# ===================== Caché de catálogo =====================
+def _cacheado(clave: Tuple[str, str], cargar) -> tuple:
+    with _catalogo_lock:
+        if clave in _catalogo:
+            return _catalogo[clave]
+    valor = cargar()
+    with _catalogo_lock:
+        _catalogo[clave] = valor
+    return valor
+
+
+def etiquetas_enum(conn, typname: str) -> Tuple[str, ...]:
+    """Etiquetas del ENUM en orden; se consulta pg_enum una sola vez por proceso."""
+    def cargar():
+        with conn.cursor() as c:
+            c.execute("""
+                SELECT e.enumlabel
+                FROM pg_type t
+                JOIN pg_enum e ON t.oid = e.enumtypid
+                WHERE t.typname = %s
+                ORDER BY e.enumsortorder;
+            """, (typname,))
+            return tuple(r[0] for r in c.fetchall())
+    return _cacheado(("enum", typname), cargar)
+
+
+def tipos_columnas(conn, tabla: str) -> Dict[str, str]:
+    """Columna → tipo SQL (format_type) de `tabla`, cacheado por proceso."""
+    def cargar():
+        with conn.cursor() as c:
+            c.execute("""
+                SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+                ORDER BY a.attnum;
+            """, (tabla,))
+            return tuple(c.fetchall())
+    return dict(_cacheado(("columnas", tabla), cargar))
+
+
+def limpiar_catalogo() -> None:
+    """Olvida el catálogo cacheado (p. ej. tras un ALTER TYPE … ADD VALUE)."""
+    with _catalogo_lock:
+        _catalogo.clear()
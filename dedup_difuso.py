@@ -0,0 +1,139 @@
+# dedup_difuso.py — Índice en memoria (MinHash + LSH por fecha) de eventos casi repetidos entre fuentes
+"""
+Un mismo espectáculo aparece en varias agendas con títulos parecidos pero no
+iguales ("Caro Jaramillo en Concierto" / "CARO JARAMILLO - concierto 2025").
+El título se normaliza (sin tildes, mayúsculas, dígitos ni palabras vacías) y se
+parte en trigramas de caracteres; cada evento recibe una firma MinHash y la
+firma se corta en bandas (LSH). Dos eventos son candidatos solo si tienen la
+misma fecha y ciudad y coinciden en al menos una banda: no se compara todo
+contra todo, y dos "Concierto de Navidad" del mismo día en Bogotá y en Cali
+siguen siendo eventos distintos.
+Cada candidato se confirma con la similitud de Jaccard exacta de sus trigramas.
+
+La firma es MinHash de una sola permutación: el hash de cada trigrama elige su
+casilla (hash % CASILLAS) y cada casilla guarda el mínimo. Cuesta un hash por
+trigrama en vez de uno por trigrama y por permutación. Un título corto deja
+casi todas las casillas vacías; se densifican (cada vacía toma el mínimo de la
+siguiente llena y la distancia), si no, todos los títulos cortos de una fecha
+compartirían bandas vacías y serían candidatos entre sí.
+"""
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+UMBRAL = 0.6      # Jaccard mínimo entre trigramas para considerar dos títulos el mismo evento
+CASILLAS = 15     # largo de la firma
+FILAS = 3         # casillas por banda: CASILLAS // FILAS bandas
+TAM_SHINGLE = 3
+
+NO_LETRAS_RE = re.compile(r"[^a-z]+")
+PALABRAS_VACIAS = frozenset("a al con de del el en la las lo los para por un una y".split())
+
+
+def normalizar_titulo(titulo: str) -> str:
+    """Minúsculas ASCII, sin dígitos ni signos ni palabras vacías: 'Ópera  2025: La Bohème' → 'opera boheme'."""
+    t = unicodedata.normalize("NFKD", titulo or "").encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(p for p in NO_LETRAS_RE.split(t) if p and p not in PALABRAS_VACIAS)
+
+
+def shingles(normalizado: str) -> Set[int]:
+    """Trigramas de caracteres (como enteros crc32); un título muy corto es su propio shingle."""
+    b = normalizado.encode()
+    if len(b) <= TAM_SHINGLE:
+        return {zlib.crc32(b)} if b else set()
+    return {zlib.crc32(b[i:i + TAM_SHINGLE]) for i in range(len(b) - TAM_SHINGLE + 1)}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def firma(sh: Set[int], casillas: int = CASILLAS) -> List[Tuple[int, int]]:
+    """
+    Por casilla, (mínimo hash que cayó en ella, 0); una casilla vacía toma
+    (mínimo de la siguiente llena en orden circular, distancia hasta ella).
+    """
+    minimos = {h % casillas: h for h in sorted(sh, reverse=True)}  # de mayor a menor: queda el mínimo
+    if not minimos:
+        return []
+    densa = []
+    for c in range(casillas):
+        d = 0
+        while (c + d) % casillas not in minimos:
+            d += 1
+        densa.append((minimos[(c + d) % casillas], d))
+    return densa
+
+
+class IndiceDifuso:
+    """
+    Se agregan eventos (ref, grupo, fecha, titulo, ciudad) y `grupos()` devuelve los
+    conjuntos de refs casi repetidos entre grupos distintos (p. ej. fuentes):
+    dentro de un mismo grupo no se fusiona nada (eso lo resuelve la clave exacta).
+    Solo se guarda el título normalizado por evento; los trigramas se recalculan
+    al confirmar candidatos, que son pocos.
+    """
+
+    def __init__(self, umbral: float = UMBRAL, casillas: int = CASILLAS, filas: int = FILAS):
+        self.umbral = umbral
+        self.casillas = casillas
+        self.filas = filas
+        self._refs: List[Hashable] = []
+        self._grupo: List[Hashable] = []
+        self._titulo: List[str] = []
+        self._cubetas: Dict[tuple, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def agregar(self, ref: Hashable, grupo: Hashable, fecha: Optional[str], titulo: str,
+                ciudad: Optional[str] = None) -> None:
+        normalizado = normalizar_titulo(titulo)
+        sh = shingles(normalizado)
+        if not fecha or not sh:
+            return
+        i = len(self._refs)
+        self._refs.append(ref)
+        self._grupo.append(grupo)
+        self._titulo.append(normalizado)
+        densa = firma(sh, self.casillas)
+        f = self.filas
+        for b in range(0, self.casillas - f + 1, f):
+            self._cubetas[(ciudad, fecha, b, *densa[b:b + f])].append(i)
+
+    def pares(self) -> Set[Tuple[int, int]]:
+        """Pares (i, j), i < j, de grupos distintos que comparten cubeta y superan el umbral de Jaccard."""
+        candidatos: Set[Tuple[int, int]] = set()
+        for miembros in self._cubetas.values():
+            if len(miembros) < 2:
+                continue
+            for x, i in enumerate(miembros):
+                for j in miembros[x + 1:]:
+                    if self._grupo[i] != self._grupo[j]:
+                        candidatos.add((i, j))
+        return {(i, j) for i, j in candidatos
+                if self._titulo[i] == self._titulo[j]
+                or jaccard(shingles(self._titulo[i]), shingles(self._titulo[j])) >= self.umbral}
+
+    def grupos(self) -> List[List[Hashable]]:
+        """Componentes (unión-búsqueda) de los pares confirmados, en orden de inserción."""
+        padre = list(range(len(self._refs)))
+
+        def raiz(i: int) -> int:
+            while padre[i] != i:
+                padre[i] = padre[padre[i]]
+                i = padre[i]
+            return i
+
+        for i, j in self.pares():
+            ri, rj = raiz(i), raiz(j)
+            if ri != rj:
+                padre[max(ri, rj)] = min(ri, rj)
+        componentes: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(self._refs)):
+            componentes[raiz(i)].append(i)
+        return [[self._refs[i] for i in c] for c in componentes.values() if len(c) > 1]
@@ -0,0 +1,363 @@
+# descargas.py — Capa HTTP compartida por los scrapers (asyncio + pool de conexiones por host)
+import asyncio
+import hashlib
+import inspect
+import os
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metricas_corrida
+from archivo_respuestas import ENV_GRABAR, ENV_REPRODUCIR, ArchivoRespuestas
+from cache_http import CacheHTTP
+from fechas_es import anio_actual
+from politica_http import CircuitoAbierto, PoliticaHost
+
+# ===================== Configuración =====================
+TIMEOUT = 15                # segundos por intento (tope; por host se adapta a la latencia)
+MAX_CONCURRENCIA = 16       # descargas simultáneas en total
+MAX_POR_HOST = 4            # conexiones keep-alive / tope del límite adaptativo por host
+REINTENTOS = 3              # intentos adicionales ante error transitorio
+BACKOFF_BASE = 0.5          # segundos; crece x2 por intento (+ jitter)
+STATUS_REINTENTABLES = {429, 500, 502, 503, 504}
+# Módulos de parseo compartidos: su código entra en la huella de cada parseo cacheado
+MODULOS_PARSEO = ("fechas_es.py", "parseo_html.py", "extraccion.py", "fuentes.py")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; QueHayPaHacer-scraper/1.0)",
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+}
+
+
+class Pagina(NamedTuple):
+    url: str
+    texto: str
+    no_modificado: bool = False   # True → el servidor respondió 304 y `texto` viene de la caché
+
+
+class Descargador:
+    """
+    Reutiliza una requests.Session por host (keep-alive + pool de MAX_POR_HOST
+    conexiones) y limita la concurrencia global con un semáforo asyncio. Por host
+    aplica una PoliticaHost (politica_http): tasa máxima, concurrencia adaptativa,
+    timeout según la latencia y cortacircuitos.
+    Las llamadas bloqueantes de requests corren en un pool de hilos propio de
+    max_concurrencia hilos (el ejecutor por defecto de asyncio tiene cpu + 4).
+    Con `cache`, las páginas se piden con If-None-Match / If-Modified-Since.
+    Con `archivo`, cada página obtenida se graba comprimida en esa corrida del
+    archivo; con `reproduccion`, las páginas salen de una corrida archivada y no
+    se toca la red (ver archivo_respuestas).
+    Con `limitar=False` los hosts nuevos no tienen tasa máxima ni concurrencia
+    adaptativa (solo el tope de max_por_host): para benchmarks contra un HTTP local.
+    """
+
+    def __init__(self, max_concurrencia: int = MAX_CONCURRENCIA, max_por_host: int = MAX_POR_HOST,
+                 timeout: float = TIMEOUT, reintentos: int = REINTENTOS, backoff: float = BACKOFF_BASE,
+                 cache: Optional[CacheHTTP] = None, limitar: bool = True):
+        self.cache = cache
+        self.limitar = limitar
+        self.archivo: Optional[ArchivoRespuestas] = None
+        self.reproduccion: Optional[ArchivoRespuestas] = None
+        self.max_concurrencia = max_concurrencia
+        self.max_por_host = max_por_host
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self._sesiones: Dict[str, requests.Session] = {}
+        self._politicas: Dict[str, PoliticaHost] = {}
+        self._lock = threading.Lock()
+        self._hilos = ThreadPoolExecutor(max_workers=max_concurrencia, thread_name_prefix="descargas")
+        # El semáforo global pertenece a un event loop: uno por loop vivo
+        # (Main --parallel --in-process corre un loop por hilo). Las políticas
+        # por host se comparten entre loops.
+        self._limites: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    # ---------- sesiones / límites ----------
+    def sesion(self, host: str) -> requests.Session:
+        with self._lock:
+            s = self._sesiones.get(host)
+            if s is None:
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_por_host)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                self._sesiones[host] = s
+            return s
+
+    def politica(self, host: str) -> PoliticaHost:
+        with self._lock:
+            p = self._politicas.get(host)
+            if p is None:
+                p = self._politicas[host] = PoliticaHost(host, self.max_por_host, self.timeout,
+                                                               limitar=self.limitar)
+            return p
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._limites:
+                self._limites[loop] = asyncio.Semaphore(self.max_concurrencia)
+            return self._limites[loop]
+
+    def cerrar(self) -> None:
+        with self._lock:
+            for s in self._sesiones.values():
+                s.close()
+            self._sesiones.clear()
+
+    async def _en_hilo(self, funcion: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._hilos, funcion, *args)
+
+    # ---------- descarga ----------
+    def _get(self, url: str, headers: Optional[dict], timeout: float) -> requests.Response:
+        # (conexión, lectura): la conexión conserva el tope fijo, la lectura se adapta
+        return self.sesion(urlsplit(url).netloc).get(url, headers=headers, timeout=(self.timeout, timeout))
+
+    async def _intento(self, politica: PoliticaHost, url: str, headers: Optional[dict]) -> requests.Response:
+        """Un GET bajo la política del host: token, turno de concurrencia y timeout adaptativo."""
+        if politica.cubo and await politica.cubo.tomar():
+            metricas_corrida.sumar(politica.host, "esperas_tasa")
+        await politica.limite.entrar()
+        t0 = time.perf_counter()
+        try:
+            async with self._semaforo():
+                resp = await self._en_hilo(self._get, url, headers, politica.timeout())
+        except requests.RequestException:
+            politica.observar(None, False)
+            raise
+        except BaseException:
+            politica.limite.liberar()
+            raise
+        lento = resp.status_code in STATUS_REINTENTABLES
+        politica.observar(time.perf_counter() - t0, not lento)
+        if politica.cubo and resp.status_code == 429 and resp.headers.get("Retry-After", "").isdigit():
+            politica.cubo.pausar(float(resp.headers["Retry-After"]))
+        return resp
+
+    def _fallo_host(self, politica: PoliticaHost) -> None:
+        if politica.circuito.fallo():
+            metricas_corrida.sumar(politica.host, "circuitos_abiertos")
+            print(f"⛔ {politica.host}: {politica.circuito.fallos_max} descargas fallidas seguidas; "
+                  f"se omite por {politica.circuito.enfriamiento:.0f}s")
+
+    async def obtener(self, url: str, headers: Optional[dict] = None) -> requests.Response:
+        """
+        GET con reintentos y backoff exponencial. Lanza la última excepción si se
+        agotan, o CircuitoAbierto sin tocar la red si el host viene fallando.
+        """
+        host = urlsplit(url).netloc
+        politica = self.politica(host)
+        try:
+            politica.circuito.permitir()
+        except CircuitoAbierto:
+            metricas_corrida.sumar(host, "omitidas_por_circuito")
+            raise
+        try:
+            for intento in range(self.reintentos + 1):
+                if intento:
+                    metricas_corrida.sumar(host, "reintentos_http")
+                try:
+                    resp = await self._intento(politica, url, headers)
+                    if resp.status_code not in STATUS_REINTENTABLES or intento == self.reintentos:
+                        resp.raise_for_status()
+                        politica.circuito.exito()
+                        return resp
+                except (requests.ConnectionError, requests.Timeout):
+                    if intento == self.reintentos:
+                        raise
+                await asyncio.sleep(self.backoff * (2 ** intento) + random.uniform(0, self.backoff))
+        except requests.HTTPError as e:
+            # 4xx (salvo 429): el host responde, el problema es la URL
+            if e.response is not None and e.response.status_code < 500 and e.response.status_code != 429:
+                politica.circuito.exito()
+            else:
+                self._fallo_host(politica)
+            raise
+        except requests.RequestException:
+            self._fallo_host(politica)
+            raise
+        except BaseException:
+            politica.circuito.soltar_prueba()  # cancelado a mitad de un intento de prueba
+            raise
+        raise RuntimeError("inalcanzable")
+
+    def _reproducir(self, url: str) -> Pagina:
+        host = urlsplit(url).netloc
+        t0 = time.perf_counter()
+        texto = self.reproduccion.leer(url)
+        if texto is None:
+            raise LookupError(f"{url} no está en la corrida archivada {self.reproduccion.ruta.name}")
+        metricas_corrida.tiempo(host, "fetch", time.perf_counter() - t0)
+        metricas_corrida.sumar(host, "descargas_archivo")
+        # no_modificado=False: se vuelve a parsear (p. ej. tras corregir un parser)
+        return Pagina(url, texto, False)
+
+    async def obtener_pagina(self, url: str, encoding: str = "utf-8") -> Pagina:
+        """GET condicional: en 304 devuelve el cuerpo en caché sin volver a descargarlo."""
+        if self.reproduccion:
+            return self._reproducir(url)
+        host = urlsplit(url).netloc
+        t0 = time.perf_counter()
+        condicionales = self.cache.cabeceras_condicionales(url) if self.cache else {}
+        resp = await self.obtener(url, condicionales or None)
+        if resp.status_code == 304:
+            texto = self.cache.cuerpo(url) if self.cache else None
+            if texto is not None:
+                metricas_corrida.tiempo(host, "fetch", time.perf_counter() - t0)
+                metricas_corrida.sumar(host, "descargas_304")
+                if self.archivo:
+                    await self._en_hilo(self.archivo.guardar, url, texto)
+                return Pagina(url, texto, True)
+            resp = await self.obtener(url)  # la entrada se podó entre medio: pedir completo
+        metricas_corrida.tiempo(host, "fetch", time.perf_counter() - t0)
+        metricas_corrida.sumar(host, "descargas")
+        metricas_corrida.sumar(host, "bytes_descargados", len(resp.content))
+        resp.encoding = encoding
+        texto = resp.text
+        etag, last_mod = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if self.cache and (etag or last_mod):
+            self.cache.guardar(url, texto, etag, last_mod)
+        if self.archivo:
+            await self._en_hilo(self.archivo.guardar, url, texto)
+        return Pagina(url, texto, False)
+
+    async def obtener_texto(self, url: str, encoding: str = "utf-8") -> str:
+        return (await self.obtener_pagina(url, encoding)).texto
+
+    async def obtener_paginas(self, urls: List[str], encoding: str = "utf-8",
+                              return_exceptions: bool = False) -> list:
+        """Descarga todas las URLs a la vez; el tiempo total ≈ el del host más lento."""
+        return await asyncio.gather(
+            *(self.obtener_pagina(u, encoding) for u in urls),
+            return_exceptions=return_exceptions,
+        )
+
+
+# Instancia compartida por todo el proceso (sesiones calientes entre scrapers).
+CACHE = CacheHTTP()
+DESCARGADOR = Descargador(cache=CACHE)
+
+
+def configurar_archivo(grabar: Optional[str] = None, reproducir: Optional[str] = None) -> None:
+    """
+    Graba las páginas en la corrida `grabar` o las sirve desde la corrida
+    `reproducir` (rutas). Al reproducir se apaga la caché HTTP: los parseos de
+    páginas viejas no deben quedar como derivados de los cuerpos vigentes.
+    """
+    DESCARGADOR.archivo = ArchivoRespuestas(grabar) if grabar else None
+    DESCARGADOR.reproduccion = ArchivoRespuestas(reproducir) if reproducir else None
+    DESCARGADOR.cache = None if reproducir else CACHE
+
+
+# Subprocesos de Main.py: el modo llega por variables de entorno
+configurar_archivo(os.environ.get(ENV_GRABAR), os.environ.get(ENV_REPRODUCIR))
+
+
+def _ejecutar(coro):
+    """asyncio.run() que también funciona si ya hay un loop corriendo en este hilo."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    resultado = {}
+
+    def _hilo():
+        try:
+            resultado["v"] = asyncio.run(coro)
+        except BaseException as e:
+            resultado["e"] = e
+
+    t = threading.Thread(target=_hilo)
+    t.start()
+    t.join()
+    if "e" in resultado:
+        raise resultado["e"]
+    return resultado["v"]
+
+
+def descargar(url: str, encoding: str = "utf-8") -> str:
+    """Versión síncrona para los scrapers: devuelve el HTML/JSON como texto."""
+    return _ejecutar(DESCARGADOR.obtener_texto(url, encoding))
+
+
+def descargar_pagina(url: str, encoding: str = "utf-8") -> Pagina:
+    return _ejecutar(DESCARGADOR.obtener_pagina(url, encoding))
+
+
+def descargar_paginas(urls: List[str], encoding: str = "utf-8",
+                      return_exceptions: bool = True) -> list:
+    """
+    Descarga varias URLs en paralelo. Con return_exceptions=True, cada posición
+    trae la Pagina o la excepción de esa URL (un host caído no tumba a los demás).
+    """
+    t0 = time.time()
+    res = _ejecutar(DESCARGADOR.obtener_paginas(urls, encoding, return_exceptions))
+    print(f"🌐 {len(urls)} descargas en {round(time.time() - t0, 2)}s")
+    return res
+
+
+@lru_cache(maxsize=None)
+def _huella_archivo(ruta: str) -> str:
+    try:
+        return hashlib.sha1(Path(ruta).read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def nombre_derivado(nombre: str, modulo: Optional[str] = None) -> str:
+    """
+    Nombre con que se cachea el resultado de un parser: `nombre` más una huella
+    del código que lo produce (el archivo `modulo` del parser y MODULOS_PARSEO) y
+    del año con que fechas_es completa las fechas sin año. Corregir un parser o
+    cambiar de año invalida lo cacheado aunque la página siga respondiendo 304.
+    """
+    base = Path(__file__).resolve().parent
+    rutas = [str(base / m) for m in MODULOS_PARSEO] + ([modulo] if modulo else [])
+    h = hashlib.sha1(f"{anio_actual()}".encode())
+    for ruta in rutas:
+        h.update(_huella_archivo(ruta).encode())
+    return f"{nombre}.{h.hexdigest()[:12]}"
+
+
+def parsear_pagina(pagina: Pagina, parsear: Callable[[str], Any]) -> Any:
+    """
+    Aplica `parsear` al HTML, salvo que la página no haya cambiado (304) y ya
+    exista el resultado de ese mismo parser (y misma versión de su código) en la
+    caché: entonces no se parsea.
+    """
+    cache = DESCARGADOR.cache if getattr(parsear, "cache_derivado", True) else None
+    nombre = nombre_derivado(parsear.__qualname__, getattr(inspect.getmodule(parsear), "__file__", None))
+    host = urlsplit(pagina.url).netloc
+    if pagina.no_modificado and cache:
+        previo = cache.leer_derivado(pagina.url, nombre)
+        if previo is not None:
+            metricas_corrida.sumar(host, "parseos_en_cache")
+            return previo
+    if getattr(parsear, "cache_derivado", True):
+        with metricas_corrida.etapa(host, "parse"):
+            resultado = parsear(pagina.texto)
+        if isinstance(resultado, list):
+            metricas_corrida.sumar(host, "eventos_parseados", len(resultado))
+    else:
+        # Sin caché derivada = parser que descarga y parsea más páginas por dentro
+        # (crawl de Idartes): cada una ya se mide en su propio fetch/parse.
+        resultado = parsear(pagina.texto)
+    if cache:
+        cache.guardar_derivado(pagina.url, nombre, resultado)
+    return resultado
+
+
+def scrapear(url: str, parsear: Callable[[str], Any]) -> Any:
+    """Descarga condicional + parseo (omitido en 304). Punto de entrada de los scrapers."""
+    return parsear_pagina(descargar_pagina(url), parsear)
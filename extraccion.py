@@ -0,0 +1,274 @@
+# extraccion.py — Motor genérico: ejecuta las declaraciones de selectores/campos de fuentes.py
+"""
+Una declaración 'extraccion' se compila una sola vez por proceso (selectores CSS
+con soupsieve, SoupStrainer para lxml, normalizadores resueltos) y luego se
+aplica a cada HTML sin volver a interpretar la declaración.
+
+  modo='tarjetas'  cada elemento que coincide con 'tarjeta' es un evento; cada
+                   campo se busca (select_one) dentro de la tarjeta
+  modo='pares'     cada campo es una lista (select) de toda la página; el evento
+                   i-ésimo toma el elemento i-ésimo de cada lista (zip)
+
+Campo: {"css": selector, "attr": atributo (por defecto el texto), "sep": separador
+de get_text, "defecto": valor si no hay elemento, "normalizar": nombre en
+NORMALIZADORES o 'modulo:funcion'}. Los campos que empiezan con '_' no salen en
+el evento: son insumo para 'post' ('modulo:funcion' que recibe el dict de campos
+y devuelve el evento, o None para descartarlo).
+
+Para crawls de muchas páginas, PoolParseo manda cada HTML a un ProcessPoolExecutor:
+el parseo (CPU) escala con los núcleos mientras las descargas siguen en asyncio.
+
+  python extraccion.py --fuente plaza --formato ndjson
+"""
+import argparse
+import asyncio
+import atexit
+import importlib
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import soupsieve
+from bs4 import SoupStrainer
+
+import fuentes
+import metricas_corrida
+from descargas import DESCARGADOR, Pagina, nombre_derivado, scrapear
+from fechas_es import fecha_o_texto, normalizar_rango
+from parseo_html import crear_soup
+from salida_eventos import FORMATOS, guardar_eventos, ruta_salida
+
+MODOS = ("tarjetas", "pares")
+PROCESOS_PARSEO = os.cpu_count() or 1
+DIGITOS_RE = re.compile(r"\d+")
+
+NORMALIZADORES: Dict[str, Callable[[Any], Any]] = {
+    "texto": lambda v: v,
+    "sin_digitos": lambda v: DIGITOS_RE.sub("", v or "").strip(),
+    "fecha_es": fecha_o_texto,
+    "rango_es": normalizar_rango,
+}
+
+
+def resolver(ref: Any) -> Callable[..., Any]:
+    """Callable, nombre de NORMALIZADORES o 'modulo:funcion'."""
+    if callable(ref):
+        return ref
+    if ref in NORMALIZADORES:
+        return NORMALIZADORES[ref]
+    modulo, sep, attr = str(ref).partition(":")
+    if not sep:
+        raise ValueError(f"Normalizador desconocido: {ref!r} (usa {', '.join(NORMALIZADORES)} o 'modulo:funcion')")
+    return getattr(importlib.import_module(modulo), attr)
+
+
+class Campo:
+    __slots__ = ("nombre", "selector", "attr", "sep", "defecto", "normalizar")
+
+    def __init__(self, nombre: str, decl: Dict[str, Any]):
+        self.nombre = nombre
+        self.selector = soupsieve.compile(decl["css"])
+        self.attr = decl.get("attr")
+        self.sep = decl.get("sep", "")
+        self.defecto = decl.get("defecto")
+        self.normalizar = resolver(decl["normalizar"]) if decl.get("normalizar") else None
+
+    def valor(self, elem) -> Any:
+        if elem is None:
+            v = self.defecto
+        elif self.attr:
+            v = elem.get(self.attr)
+        else:
+            v = elem.get_text(self.sep, strip=True)
+        return self.normalizar(v) if self.normalizar else v
+
+
+class Extractor:
+    """Declaración compilada de una fuente. Se llama como los scrapers: extractor(html=None, backend=None)."""
+
+    def __init__(self, clave: str, decl: Dict[str, Any], url: Optional[str] = None):
+        modo = decl.get("modo", "tarjetas")
+        if modo not in MODOS:
+            raise ValueError(f"Fuente {clave!r}: modo desconocido {modo!r} (usa {', '.join(MODOS)})")
+        self.clave = clave
+        self.url = url
+        self.modo = modo
+        # parsear_pagina guarda el resultado derivado bajo este nombre
+        self.__qualname__ = f"extraccion.{clave}"
+        self.tarjeta = soupsieve.compile(decl["tarjeta"]) if modo == "tarjetas" else None
+        self.solo = SoupStrainer(**decl["solo"]) if decl.get("solo") else None
+        self.campos = [Campo(n, c) for n, c in decl["campos"].items()]
+        self.requeridos = tuple(decl.get("requeridos", ()))
+        self.post = resolver(decl["post"]) if decl.get("post") else None
+
+    def _armar(self, valores: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if any(not valores.get(r) for r in self.requeridos):
+            return None
+        if self.post:
+            return self.post(valores)
+        return {k: v for k, v in valores.items() if not k.startswith("_")}
+
+    def iterar(self, html: str, backend: Optional[str] = None):
+        soup = crear_soup(html, self.solo, backend)
+        if self.modo == "tarjetas":
+            for tarjeta in self.tarjeta.select(soup):
+                ev = self._armar({c.nombre: c.valor(c.selector.select_one(tarjeta)) for c in self.campos})
+                if ev is not None:
+                    yield ev
+        else:
+            columnas = [[c.valor(e) for e in c.selector.select(soup)] for c in self.campos]
+            nombres = [c.nombre for c in self.campos]
+            for fila in zip(*columnas):
+                ev = self._armar(dict(zip(nombres, fila)))
+                if ev is not None:
+                    yield ev
+
+    def __call__(self, html: Optional[str] = None, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+        if html is None:
+            if not self.url:
+                raise ValueError(f"Fuente {self.clave!r}: sin url para descargar")
+            return scrapear(self.url, self)
+        return list(self.iterar(html, backend))
+
+
+def compilar(clave: str, decl: Dict[str, Any], url: Optional[str] = None) -> Extractor:
+    return Extractor(clave, decl, url)
+
+
+@lru_cache(maxsize=None)
+def extractor(clave: str) -> Extractor:
+    """Extractor compilado de una fuente registrada (uno por proceso)."""
+    decl = fuentes.obtener(clave)
+    if "extraccion" not in decl:
+        raise ValueError(f"Fuente {clave!r}: no declara 'extraccion'")
+    return compilar(clave, decl["extraccion"], decl["url"])
+
+
+# ===================== Parseo en procesos =====================
+Compacto = Tuple[Optional[Tuple[str, ...]], list]
+
+
+def extraer_compacto(clave: str, html: str, backend: Optional[str] = None) -> Compacto:
+    """
+    Corre en el worker: extrae con la declaración compilada de ese proceso y
+    devuelve (campos, filas) con una tupla por evento en vez de un dict (menos
+    bytes que serializar de vuelta). Si los eventos no comparten campos, (None, dicts).
+    """
+    eventos = extractor(clave)(html, backend)
+    if not eventos:
+        return (), []
+    campos = tuple(eventos[0])
+    if any(tuple(ev) != campos for ev in eventos):
+        return None, eventos
+    return campos, [tuple(ev.values()) for ev in eventos]
+
+
+def _worker_listo() -> None:
+    """No hace nada: deserializarla en el worker ya importa este módulo y los parsers."""
+
+
+def expandir(compacto: Compacto) -> List[Dict[str, Any]]:
+    campos, filas = compacto
+    if campos is None:
+        return filas
+    return [dict(zip(campos, fila)) for fila in filas]
+
+
+class PoolParseo:
+    """
+    Workers de parseo (procesos 'spawn': no heredan hilos/locks del padre) que
+    se crean en el primer uso y se reutilizan entre páginas y corridas. Respeta
+    la caché de parseos de descargas: una página 304 ya parseada no viaja al pool.
+    """
+
+    def __init__(self, procesos: int = PROCESOS_PARSEO):
+        self.procesos = max(1, procesos)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def caliente(self) -> bool:
+        """Los workers ya arrancaron (usarlo no cuesta el arranque)."""
+        return self._pool is not None
+
+    def _ejecutor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def calentar(self) -> None:
+        """Arranca los workers en segundo plano, sin esperar a que terminen de importar."""
+        ejecutor = self._ejecutor()
+        for _ in range(self.procesos):
+            ejecutor.submit(_worker_listo)
+
+    async def parsear(self, clave: str, pagina: Pagina, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+        cache = DESCARGADOR.cache
+        nombre = nombre_derivado(f"extraccion.{clave}", __file__)
+        host = urlsplit(pagina.url).netloc
+        if pagina.no_modificado and cache:
+            previo = cache.leer_derivado(pagina.url, nombre)
+            if previo is not None:
+                metricas_corrida.sumar(host, "parseos_en_cache")
+                return previo
+        t0 = time.perf_counter()
+        compacto = await asyncio.get_running_loop().run_in_executor(
+            self._ejecutor(), extraer_compacto, clave, pagina.texto, backend)
+        eventos = expandir(compacto)
+        metricas_corrida.tiempo(host, "parse", time.perf_counter() - t0)
+        metricas_corrida.sumar(host, "eventos_parseados", len(eventos))
+        if cache:
+            cache.guardar_derivado(pagina.url, nombre, eventos)
+        return eventos
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+_pools: Dict[int, PoolParseo] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_parseo(procesos: int = PROCESOS_PARSEO) -> PoolParseo:
+    """Un PoolParseo por tamaño y por proceso (queda caliente en Main --daemon)."""
+    with _pools_lock:
+        if procesos not in _pools:
+            _pools[procesos] = PoolParseo(procesos)
+        return _pools[procesos]
+
+
+@atexit.register
+def _cerrar_pools() -> None:
+    for pool in list(_pools.values()):
+        pool.cerrar()
+
+
+def scraper(clave: str) -> Callable[..., List[Dict[str, Any]]]:
+    """Función de scraping de la fuente: la propia ('funcion') o la declarativa."""
+    decl = fuentes.obtener(clave)
+    if decl.get("funcion"):
+        return resolver(decl["funcion"])
+    return extractor(clave)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Scraping de una fuente registrada en fuentes.py")
+    ap.add_argument("--fuente", required=True, choices=list(fuentes.FUENTES))
+    ap.add_argument("--formato", choices=FORMATOS, default="json", help="ndjson: un evento por línea")
+    args = ap.parse_args()
+
+    decl = fuentes.obtener(args.fuente)
+    eventos = scraper(args.fuente)()
+    ruta_json = fuentes.ruta_archivo(decl)
+    n = guardar_eventos(eventos, ruta_json, args.formato)
+    print(f"✅ {n} eventos de {decl['nombre']} guardados en {ruta_salida(ruta_json, args.formato)}")
@@ -0,0 +1,141 @@
+# fechas_es.py — Normalización de fechas en español compartida por los scrapers
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MESES = {
+    "enero": "01", "febrero": "02", "marzo": "03",
+    "abril": "04", "mayo": "05", "junio": "06",
+    "julio": "07", "agosto": "08", "septiembre": "09",
+    "octubre": "10", "noviembre": "11", "diciembre": "12"
+}
+
+# Patrones compilados una sola vez por proceso
+HORA_RE = re.compile(r"(\d{1,2}[:.]\d{2}\s*(a\.?m\.?|p\.?m\.?)?)", re.IGNORECASE)
+DIA_MES_RE = re.compile(r"(\d{1,2})\s+de\s+([a-záéíóú]+)", re.IGNORECASE)
+DIA_RE = re.compile(r"(\d{1,2})")
+MES_RE = re.compile(r"(" + "|".join(MESES) + r")", re.IGNORECASE)
+
+TAM_CACHE = 4096  # las agendas repiten mucho las mismas fechas
+
+
+def anio_actual() -> int:
+    return datetime.now().year
+
+
+def _iso(year: int, mes: str, dia: str) -> str:
+    return f"{year}-{mes.zfill(2)}-{str(dia).zfill(2)}"
+
+
+def convertir_fecha_simple(fecha_txt: str, year: Optional[int] = None) -> Optional[str]:
+    """
+    Convierte textos tipo '10 de noviembre' -> 'YYYY-11-10'
+    Devuelve None si no puede convertir.
+    """
+    if not fecha_txt:
+        return None
+    return _fecha_iso(fecha_txt, year or anio_actual())
+
+
+@lru_cache(maxsize=TAM_CACHE)
+def _fecha_iso(fecha_txt: str, year: int) -> Optional[str]:
+    m = DIA_MES_RE.search(fecha_txt)
+    if m:
+        mes = MESES.get(m.group(2).lower())
+        if mes:
+            return _iso(year, mes, m.group(1))
+    return None
+
+
+@lru_cache(maxsize=TAM_CACHE)
+def _rango(fecha_raw: str, year: int) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(fecha_inicio, fecha_fin, hora). Cacheado por (texto crudo, año)."""
+    txt = " ".join(fecha_raw.split()).strip().lower()
+    hora = None
+
+    # Capturar hora si viene en el texto (p. ej., " - 7:00 p.m." o "7:00 pm")
+    hora_match = HORA_RE.search(txt)
+    if hora_match:
+        hora = hora_match.group(1)
+
+    # Rango: "10 al 12 de noviembre" / "17 de septiembre al 6 de noviembre"
+    if " al " in txt:
+        partes = [p.strip() for p in txt.split(" al ")]
+        m2 = DIA_MES_RE.search(partes[1])
+        if m2:
+            dia2 = m2.group(1)
+            mes2 = MESES.get(m2.group(2).lower())
+            m1 = DIA_MES_RE.search(partes[0])
+            if m1:
+                dia1 = m1.group(1)
+                mes1 = MESES.get(m1.group(2).lower())
+            else:
+                # Primer fragmento solo trae día: toma el mes del segundo
+                m1d = DIA_RE.search(partes[0])
+                dia1 = m1d.group(1) if m1d else None
+                mes1 = mes2
+            if mes1 and mes2 and dia1 and dia2:
+                return _iso(year, mes1, dia1), _iso(year, mes2, dia2), hora
+        # Si no se pudo parsear como rango, caemos a intentos simples más abajo.
+
+    # Caso "5 de diciembre - 7:30 p.m." o "5 de diciembre"
+    m = DIA_MES_RE.search(txt)
+    if m:
+        mes = MESES.get(m.group(2).lower())
+        if mes and m.group(1).isdigit():
+            fecha = _iso(year, mes, m.group(1))
+            return fecha, fecha, hora
+
+    # Último recurso: primer número + primer mes encontrado
+    m_dia = DIA_RE.search(txt)
+    m_mes = MES_RE.search(txt)
+    if m_dia and m_mes:
+        mes = MESES.get(m_mes.group(1).lower())
+        if mes:
+            fecha = _iso(year, mes, m_dia.group(1))
+            return fecha, fecha, hora
+
+    return None, None, hora
+
+
+def normalizar_rango(fecha_raw: str, year: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """
+    Normaliza fechas en español que pueden venir como:
+      - '10 al 12 de noviembre'
+      - '5 de diciembre - 7:30 p.m.'
+      - '12 de noviembre'
+    Retorna dict con: fecha_inicio, fecha_fin, hora (strings o None).
+    No 'adivina' formatos raros: si no puede, deja None lo que no se pueda inferir.
+    """
+    if not fecha_raw or fecha_raw == "N/A":
+        return {"fecha_inicio": None, "fecha_fin": None, "hora": None}
+    inicio, fin, hora = _rango(fecha_raw, year or anio_actual())
+    return {"fecha_inicio": inicio, "fecha_fin": fin, "hora": hora}
+
+
+def fecha_o_texto(fecha_raw: str, year: Optional[int] = None) -> Optional[str]:
+    """'YYYY-MM-DD' si el texto trae 'd de mes'; si no, el texto capitalizado; None si viene vacío."""
+    if not fecha_raw or fecha_raw == "N/A":
+        return None
+    return _fecha_iso(fecha_raw, year or anio_actual()) or fecha_raw.strip().title()
+
+
+def normalizar_columna(valores: Iterable[str], year: Optional[int] = None) -> List[Dict[str, Optional[str]]]:
+    """
+    Versión por lotes de normalizar_rango para una columna completa: cada texto
+    distinto se resuelve una sola vez y el resultado se reparte a sus repeticiones.
+    """
+    year = year or anio_actual()
+    valores = list(valores)
+    resueltos = {v: normalizar_rango(v, year) for v in dict.fromkeys(valores)}
+    return [dict(resueltos[v]) for v in valores]
+
+
+def info_cache() -> Dict[str, object]:
+    return {"rango": _rango.cache_info(), "fecha_iso": _fecha_iso.cache_info()}
+
+
+def limpiar_cache() -> None:
+    _rango.cache_clear()
+    _fecha_iso.cache_clear()
@@ -0,0 +1,119 @@
+# generar_fixtures.py — Snapshots HTML de las agendas (estructura real de cada sitio) a partir de los JSON publicados
+import argparse
+import html
+import json
+import os
+import random
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SALIDA = os.path.join(BASE_DIR, "fixtures", "html")
+
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+
+def fecha_txt(iso: str) -> str:
+    _, m, d = iso.split("-")
+    return f"{int(d)} de {MESES[int(m) - 1]}"
+
+
+def ruido(n: int) -> str:
+    """Contenido que los scrapers no usan (menús, scripts, iconos, pie) y que sí pesa en el parseo."""
+    nav = "".join(f'<li class="menu-item"><a href="/seccion-{i}">Sección {i}</a></li>' for i in range(n))
+    svg = '<svg viewBox="0 0 24 24"><path d="M12 2L2 7l10 5 10-5-10-5z"/></svg>' * (n // 4)
+    script = "<script>window.__DATA__ = " + json.dumps({"k": list(range(n * 5))}) + ";</script>"
+    return f'<header><nav><ul class="menu">{nav}</ul></nav>{svg}</header>{script}'
+
+
+def pagina(cuerpo: str, n_ruido: int) -> str:
+    return ("<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\"><title>Agenda</title>"
+            "<style>.x{color:red}</style></head><body>"
+            f"{ruido(n_ruido)}<main>{cuerpo}</main>"
+            f"<footer>{ruido(n_ruido // 2)}</footer></body></html>")
+
+
+def idartes(eventos: list) -> str:
+    cajas = []
+    for ev in eventos:
+        fi, ff = ev.get("fecha_inicio"), ev.get("fecha_fin")
+        if fi and ff and fi != ff:
+            fecha = f"<span>{fecha_txt(fi)}</span> al <span>{fecha_txt(ff)}</span>"
+        else:
+            fecha = f"<span>{fecha_txt(fi)}</span>" if fi else "<span>Por confirmar</span>"
+        if ev.get("hora"):
+            fecha += f" - {ev['hora']}"
+        ingreso = {"LIBRE": "Entrada libre", "COSTO": "Con costo"}.get(ev.get("ingreso"), "Inscripción previa")
+        href = (ev.get("url") or "").replace("https://www.idartes.gov.co", "")
+        cajas.append(
+            '<div class="col-md-4"><div class="cajashomeeventos">'
+            f'<img src="/sites/default/files/{random.randint(1, 9999)}.jpg" alt="">'
+            f'<div class="ctg-ev-24 position-absolute bg-white">{html.escape(ev["tipo"])}</div>'
+            f'<div class="fecha-ev24">{fecha}</div>'
+            f'<h3><a href="{href}" hreflang="es">{html.escape(ev["nombre"])}</a></h3>'
+            f'<div class="tipo_cajashomeeventos font2">{ingreso}</div>'
+            "</div></div>"
+        )
+    return '<div class="view-agenda"><div class="row">' + "".join(cajas) + "</div></div>"
+
+
+def pablotobon(eventos: list) -> str:
+    tipos = {"MÚSICA": ("musica", "Música"), "TEATRO": ("teatro", "Teatro"),
+             "DANZA": ("danza", "Danza"), "COMEDIA": ("comedia", "Comedia")}
+    cards = ['<h2 class="section-title">Próximos eventos</h2>']
+    for ev in eventos:
+        clase, texto = tipos.get(ev["tipo"], ("otros", "Otros"))
+        entrada = ("entrada-libre", "Entrada libre") if ev["ingreso"] == "LIBRE" else ("entrada-paga", "Entrada con costo")
+        fecha = f'<p class="mb-0">{fecha_txt(ev["fecha"])}</p><p class="mb-0">8:00 p.m.</p>' if ev.get("fecha") else ""
+        cards.append(
+            '<article class="card-evento">'
+            '<div class="chips">'
+            f'<div class="chips__chip chips__chip--{clase}">{texto}</div>'
+            f'<div class="chips__chip chips__chip--{entrada[0]}">{entrada[1]}</div>'
+            "</div>"
+            f'<a href="/evento/{random.randint(1, 9999)}"><h2>{html.escape(ev["nombre"])}</h2></a>'
+            f'<div class="card-evento__fecha">{fecha}</div>'
+            "</article>"
+        )
+    cards.append('<h2 class="section-title">Eventos pasados</h2>')
+    return '<section class="eventos">' + "".join(cards) + "</section>"
+
+
+def teatroplaza(eventos: list) -> str:
+    bloques = []
+    for ev in eventos:
+        bloques.append(
+            '<div class="elementor-widget-container">'
+            f'<h2 class="elementor-heading-title elementor-size-default">{html.escape(ev["nombre"])}</h2>'
+            '<p><font style="vertical-align: inherit;">'
+            f'<span style="vertical-align: inherit;">{fecha_txt(ev["fecha"])}</span></font></p>'
+            "</div>"
+        )
+    return '<div class="elementor-section">' + "".join(bloques) + "</div>"
+
+
+FUENTES = {
+    "idartes": ("scraping_idartes.json", idartes),
+    "teatropablotobon": ("scraping_teatropablotobon.json", pablotobon),
+    "teatroplasa": ("scraping_teatroplasa.json", teatroplaza),
+}
+
+
+def generar(nombre: str, repetir: int = 1, n_ruido: int = 400) -> str:
+    archivo, plantilla = FUENTES[nombre]
+    with open(os.path.join(BASE_DIR, archivo), "r", encoding="utf-8") as f:
+        eventos = json.load(f)
+    return pagina(plantilla(eventos * repetir), n_ruido)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Genera fixtures/html/<fuente>.html")
+    ap.add_argument("--repetir", type=int, default=1, help="Multiplica los eventos (páginas sintéticas grandes)")
+    args = ap.parse_args()
+    random.seed(7)
+    os.makedirs(SALIDA, exist_ok=True)
+    for nombre in FUENTES:
+        sufijo = "" if args.repetir == 1 else f"_x{args.repetir}"
+        ruta = os.path.join(SALIDA, f"{nombre}{sufijo}.html")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(generar(nombre, args.repetir))
+        print(f"✅ {ruta}")
@@ -0,0 +1,154 @@
+# verificar_descargas.py — Comprueba la capa HTTP (descargas.Descargador) contra un servidor local que sirve los fixtures
+"""
+Levanta un ThreadingHTTPServer con fixtures/html/*.html y verifica:
+  - reintentos con backoff ante 5xx: una URL que responde 503 dos veces se
+    obtiene al tercer intento, tras esperar el backoff;
+  - una URL que siempre responde 503 se rinde tras 1 + REINTENTOS intentos;
+  - un 404 no se reintenta;
+  - que las descargas simultáneas llegan al tope por host (max_por_host) y
+    al global (max_concurrencia) sin pasarlos, con respuestas lentas
+    servidas a dos hosts (127.0.0.1 y localhost).
+Sale con código 1 ante el primer fallo.
+
+  python fixtures/verificar_descargas.py
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from descargas import Descargador  # noqa: E402
+from politica_http import PoliticaHost  # noqa: E402
+
+FIXTURES = os.path.join(BASE_DIR, "fixtures", "html")
+BACKOFF = 0.05
+LENTO = 0.2  # segundos por respuesta en /lento/
+
+
+def servidor():
+    cuerpos = {}
+    for nombre in os.listdir(FIXTURES):
+        with open(os.path.join(FIXTURES, nombre), "rb") as f:
+            cuerpos[nombre] = f.read()
+    pedidos = Counter()
+    estado = {"en_vuelo": Counter(), "max_host": Counter(), "total": 0, "max_total": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            host = self.headers.get("Host", "").split(":")[0]
+            with lock:
+                pedidos[self.path] += 1
+                n = pedidos[self.path]
+                estado["en_vuelo"][host] += 1
+                estado["total"] += 1
+                estado["max_host"][host] = max(estado["max_host"][host], estado["en_vuelo"][host])
+                estado["max_total"] = max(estado["max_total"], estado["total"])
+            try:
+                _, modo, archivo = self.path.split("?")[0].split("/", 2)
+                if modo == "lento":
+                    time.sleep(LENTO)
+                if modo == "falla" or (modo == "falla2" and n <= 2):
+                    codigo, cuerpo = 503, b"no disponible"
+                elif archivo in cuerpos:
+                    codigo, cuerpo = 200, cuerpos[archivo]
+                else:
+                    codigo, cuerpo = 404, b"no existe"
+                self.send_response(codigo)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+            finally:
+                with lock:
+                    estado["en_vuelo"][host] -= 1
+                    estado["total"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, pedidos, estado
+
+
+def descargador(puerto: int, **kw) -> Descargador:
+    """Sin caché ni tasa por host, y sin estado de cortacircuitos en disco."""
+    d = Descargador(backoff=BACKOFF, cache=None, limitar=False, **kw)
+    for host in ("127.0.0.1", "localhost"):
+        netloc = f"{host}:{puerto}"
+        d._politicas[netloc] = PoliticaHost(netloc, d.max_por_host, d.timeout, circuitos_dir=None, limitar=False)
+    return d
+
+
+def comprobar(condicion: bool, mensaje: str) -> None:
+    if not condicion:
+        print(f"❌ {mensaje}")
+        sys.exit(1)
+    print(f"✅ {mensaje}")
+
+
+async def verificar(puerto: int, pedidos: Counter, estado: dict) -> None:
+    base = f"http://127.0.0.1:{puerto}"
+    with open(os.path.join(FIXTURES, "idartes.html"), "r", encoding="utf-8") as f:
+        fixture = f.read()
+
+    d = descargador(puerto)
+    t0 = time.perf_counter()
+    pagina = await d.obtener_pagina(f"{base}/falla2/idartes.html")
+    espera = time.perf_counter() - t0
+    comprobar(pagina.texto == fixture and pedidos["/falla2/idartes.html"] == 3,
+              "503 x2 → el tercer intento trae el fixture completo")
+    comprobar(espera >= BACKOFF * (1 + 2), f"con backoff exponencial entre intentos ({espera:.2f}s)")
+
+    try:
+        await d.obtener(f"{base}/falla/idartes.html")
+        comprobar(False, "503 permanente debería lanzar HTTPError")
+    except requests.HTTPError as e:
+        comprobar(e.response.status_code == 503 and pedidos["/falla/idartes.html"] == 1 + d.reintentos,
+                  f"503 permanente → HTTPError tras {1 + d.reintentos} intentos")
+
+    try:
+        await d.obtener(f"{base}/ok/no-existe.html")
+        comprobar(False, "404 debería lanzar HTTPError")
+    except requests.HTTPError:
+        comprobar(pedidos["/ok/no-existe.html"] == 1, "404 → sin reintentos")
+
+    urls = [f"http://{h}:{puerto}/lento/teatroplasa.html?{i}" for i in range(6) for h in ("127.0.0.1", "localhost")]
+    for max_concurrencia, max_por_host, esperado in ((20, 3, {"127.0.0.1": 3, "localhost": 3}),
+                                                     (4, 3, None), (8, 4, {"127.0.0.1": 4, "localhost": 4})):
+        estado["max_host"].clear()
+        estado["max_total"] = 0
+        d = descargador(puerto, max_concurrencia=max_concurrencia, max_por_host=max_por_host)
+        paginas = await d.obtener_paginas(urls)
+        d.cerrar()
+        comprobar(len(paginas) == len(urls) and all(p.texto for p in paginas),
+                  f"{len(urls)} descargas lentas en dos hosts (global={max_concurrencia}, por host={max_por_host})")
+        if esperado:
+            comprobar(dict(estado["max_host"]) == esperado,
+                      f"  en vuelo por host = max_por_host (máx. {dict(estado['max_host'])})")
+        else:
+            comprobar(estado["max_total"] == max_concurrencia
+                      and max(estado["max_host"].values()) <= max_por_host,
+                      f"  en vuelo total = max_concurrencia (máx. {estado['max_total']})")
+
+
+def main() -> int:
+    srv, pedidos, estado = servidor()
+    try:
+        asyncio.run(verificar(srv.server_address[1], pedidos, estado))
+    finally:
+        srv.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# verificar_pablotobon.py — Comprueba sobre los fixtures que la extracción lineal de Pablo Tobón da lo mismo que la original
+"""
+extraer_lineal (un recorrido) debe reproducir a extraer_por_titulo
+(find_previous/find_next por título) evento por evento, con cada backend de
+parseo disponible. Recorre fixtures/html/teatropablotobon*.html (también los
+generados con --repetir). Sale con código 1 ante la primera diferencia.
+
+  python fixtures/verificar_pablotobon.py
+"""
+import glob
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from parseo_html import BACKENDS, HAY_LXML  # noqa: E402
+from scraping_teatropablotobon import scrape_eventos  # noqa: E402
+
+
+def main() -> int:
+    rutas = sorted(glob.glob(os.path.join(BASE_DIR, "fixtures", "html", "teatropablotobon*.html")))
+    if not rutas:
+        print("❌ No hay fixtures de teatropablotobon (corre fixtures/generar_fixtures.py)")
+        return 1
+    backends = [b for b in BACKENDS if b != "lxml" or HAY_LXML]
+    for ruta in rutas:
+        with open(ruta, "r", encoding="utf-8") as f:
+            html = f.read()
+        referencia = None
+        for backend in backends:
+            lineal = scrape_eventos(html, backend, modo="lineal")
+            por_titulo = scrape_eventos(html, backend, modo="por_titulo")
+            if not lineal:
+                print(f"❌ {os.path.basename(ruta)} [{backend}]: sin eventos")
+                return 1
+            if lineal != por_titulo:
+                i = next((i for i, (a, b) in enumerate(zip(lineal, por_titulo)) if a != b),
+                         min(len(lineal), len(por_titulo)))
+                print(f"❌ {os.path.basename(ruta)} [{backend}]: lineal ≠ por_titulo desde el evento {i} "
+                      f"({len(lineal)} vs {len(por_titulo)} eventos)")
+                return 1
+            if referencia is not None and lineal != referencia:
+                print(f"❌ {os.path.basename(ruta)}: {backend} da otros eventos que {backends[0]}")
+                return 1
+            referencia = lineal
+        print(f"✅ {os.path.basename(ruta)}: {len(referencia)} eventos iguales en ambos modos ({', '.join(backends)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# fuentes.py — Registro único de fuentes (venues): URL, ciudad, archivos y cómo se extraen sus eventos
+"""
+Cada fuente se declara una sola vez aquí y de este registro salen la lista de
+scrapers de Main.py y las FUENTES de cargar_eventos.py (ya no pueden divergir).
+
+Claves de una declaración:
+  nombre     nombre legible del venue
+  ciudad     ciudad del venue
+  url        página de la agenda que se scrapea
+  archivo    JSON que produce el scraper (y lee el cargador), relativo al repo
+             (o al directorio de la variable ENV_SALIDA, p. ej. en Main --replay)
+  publicado  URL del JSON publicado en GitHub (respaldo del cargador)
+  script     script propio (subprocesos de Main.py); si falta: 'extraccion.py --fuente <clave>'
+  funcion    'modulo:funcion' de scraping para --in-process (html=None → descarga)
+  extraccion declaración de selectores/campos que ejecuta extraccion.py
+             (ver extraccion.compilar); alternativa a escribir una función propia
+
+El registro es solo datos (sin bs4): el cargador lo importa sin dependencias de parseo.
+"""
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from metricas_corrida import registrar_fuente
+
+BASE_DIR = Path(__file__).resolve().parent
+ENV_SALIDA = "EVENTOS_SALIDA_DIR"
+RAW_GITHUB = "https://raw.githubusercontent.com/ZValentinaF/Proyecto-Integrador-scrapings/main/"
+
+FUENTES: Dict[str, Dict[str, Any]] = {}
+
+
+def registrar(clave: str, **declaracion: Any) -> Dict[str, Any]:
+    """Agrega (o reemplaza) una fuente. Completa archivo/publicado por convención."""
+    for campo in ("nombre", "ciudad", "url"):
+        if not declaracion.get(campo):
+            raise ValueError(f"Fuente {clave!r}: falta '{campo}'")
+    if "funcion" not in declaracion and "extraccion" not in declaracion:
+        raise ValueError(f"Fuente {clave!r}: declara 'funcion' o 'extraccion'")
+    declaracion.setdefault("archivo", f"scraping_{clave}.json")
+    declaracion.setdefault("publicado", RAW_GITHUB + declaracion["archivo"])
+    declaracion["clave"] = clave
+    FUENTES[clave] = declaracion
+    registrar_fuente(declaracion["url"], clave)
+    return declaracion
+
+
+def obtener(clave: str) -> Dict[str, Any]:
+    try:
+        return FUENTES[clave]
+    except KeyError:
+        raise ValueError(f"Fuente desconocida: {clave!r} (registradas: {', '.join(FUENTES)})") from None
+
+
+def seleccionar(claves: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Declaraciones en orden de registro; `claves` (lista o 'a,b') filtra."""
+    if claves is None:
+        return list(FUENTES.values())
+    if isinstance(claves, str):
+        claves = claves.split(",")
+    pedidas = [c.strip() for c in claves if c.strip()]
+    for c in pedidas:
+        obtener(c)
+    return [d for c, d in FUENTES.items() if c in pedidas]
+
+
+def ruta_archivo(decl: Dict[str, Any]) -> str:
+    """Ruta del JSON de la fuente: en el repo, salvo que ENV_SALIDA apunte a otro directorio."""
+    return str(Path(os.environ.get(ENV_SALIDA) or BASE_DIR) / decl["archivo"])
+
+
+# ===================== Fuentes =====================
+registrar(
+    "idartes",
+    nombre="Idartes",
+    ciudad="Bogotá",
+    url="https://www.idartes.gov.co/es/agenda",
+    script="scraping_idartes.py",
+    # Crawl multipágina propio; cada página se extrae con la declaración de abajo
+    funcion="scraping_idartes:scrape_idartes_completo",
+    extraccion={
+        "modo": "tarjetas",
+        "tarjeta": "div.cajashomeeventos",
+        "solo": {"name": "div", "class_": "cajashomeeventos"},
+        "campos": {
+            "tipo": {"css": "div.ctg-ev-24.position-absolute.bg-white", "defecto": "N/A"},
+            "_enlace": {"css": 'a[hreflang="es"]'},
+            "_href": {"css": 'a[hreflang="es"]', "attr": "href"},
+            "_fecha": {"css": "div.fecha-ev24", "sep": " ", "defecto": "N/A"},
+            "_ingreso": {"css": "div.tipo_cajashomeeventos.font2", "defecto": "N/A"},
+        },
+        "post": "scraping_idartes:armar_evento",
+    },
+)
+
+registrar(
+    "pablobon",
+    nombre="Teatro Pablo Tobón Uribe",
+    ciudad="Medellín",
+    url="https://teatropablotobon.com/eventos/",
+    script="scraping_teatropablotobon.py",
+    archivo="scraping_teatropablotobon.json",
+    # Los datos de cada tarjeta dependen del orden del documento (chips antes del
+    # título, fecha después): no se expresa con selectores por tarjeta.
+    funcion="scraping_teatropablotobon:scrape_eventos",
+)
+
+registrar(
+    "plaza",
+    nombre="Teatro Astor Plaza",
+    ciudad="Cali",
+    url="https://teatroastorplaza.com",
+    script="scraping_teatroplasa.py",
+    archivo="scraping_teatroplasa.json",
+    funcion="scraping_teatroplasa:scrape_teatroplaza",
+    extraccion={
+        # i-ésimo título con i-ésima fecha
+        "modo": "pares",
+        "solo": {"name": ["h2", "span"]},
+        "campos": {
+            "nombre": {"css": "h2.elementor-heading-title", "normalizar": "sin_digitos"},
+            "fecha": {"css": 'span[style="vertical-align: inherit;"]', "normalizar": "fecha_es"},
+        },
+        "requeridos": ["nombre", "fecha"],
+    },
+)
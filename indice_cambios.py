@@ -0,0 +1,74 @@
+# indice_cambios.py — Índice local (SQLite) de hashes de contenido por fuente/evento para cargas incrementales
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+RUTA_INDICE = BASE_DIR / "indice_eventos.sqlite"
+
+
+def hash_fila(fila: tuple) -> str:
+    """Hash estable del contenido que se enviaría a 'evento'."""
+    return hashlib.blake2b(repr(fila).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class IndiceCambios:
+    """
+    Guarda, por (fuente, clave del evento), el hash de la última versión cargada.
+    La clave es la misma identidad que usa la BD para deduplicar: titulo|fecha_publicacion.
+    Solo se confirma después del commit en la BD: si la carga falla, el índice no avanza.
+    """
+
+    def __init__(self, ruta: Path = RUTA_INDICE):
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS evento_hash (
+                fuente TEXT NOT NULL,
+                clave  TEXT NOT NULL,
+                hash   TEXT NOT NULL,
+                visto  REAL NOT NULL,
+                PRIMARY KEY (fuente, clave)
+            ) WITHOUT ROWID
+        """)
+        self._con.commit()
+
+    @staticmethod
+    def clave(titulo: str, fecha: str) -> str:
+        return f"{titulo}|{fecha}"
+
+    def hashes(self, fuente: str) -> Dict[str, str]:
+        """Todos los hashes conocidos de la fuente (una sola consulta por carga)."""
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT clave, hash FROM evento_hash WHERE fuente = ?", (fuente,)
+            ).fetchall()
+        return dict(rows)
+
+    def confirmar(self, fuente: str, pares: Iterable[Tuple[str, str]]) -> None:
+        ahora = time.time()
+        with self._lock:
+            self._con.executemany(
+                "INSERT INTO evento_hash (fuente, clave, hash, visto) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (fuente, clave) DO UPDATE SET hash = excluded.hash, visto = excluded.visto",
+                ((fuente, c, h, ahora) for c, h in pares),
+            )
+            self._con.commit()
+
+    def olvidar(self, fuente: Optional[str] = None) -> None:
+        """Vacía el índice (p. ej. si la tabla 'evento' se recreó)."""
+        with self._lock:
+            if fuente is None:
+                self._con.execute("DELETE FROM evento_hash")
+            else:
+                self._con.execute("DELETE FROM evento_hash WHERE fuente = ?", (fuente,))
+            self._con.commit()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._con.close()
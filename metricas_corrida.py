@@ -0,0 +1,177 @@
+# metricas_corrida.py — Instrumentación por corrida: segundos por etapa y contadores por fuente
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+ETAPAS = ("fetch", "parse", "normalizar", "validar", "bd")
+
+# Subprocesos (Main.py sin --in-process): si esta variable trae una ruta, el
+# proceso registra sus métricas y las vuelca ahí en JSON al terminar.
+ENV_SALIDA = "METRICAS_CORRIDA"
+
+_alias: Dict[str, str] = {}
+_alias_lock = threading.Lock()
+
+
+def registrar_fuente(url: str, fuente: str) -> None:
+    """Lo que la capa HTTP mide por host se reporta con el nombre de la fuente."""
+    with _alias_lock:
+        _alias[urlsplit(url).netloc or url] = fuente
+
+
+def nombre_fuente(clave: str) -> str:
+    with _alias_lock:
+        return _alias.get(clave, clave)
+
+
+def _ts(t: float) -> str:
+    return datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Corrida:
+    """
+    Acumula, por fuente, '<etapa>_s' (segundos) y contadores (bytes_descargados,
+    reintentos_http, eventos_*). Seguro entre hilos: scrapers y fuentes del
+    cargador corren en paralelo.
+    """
+
+    def __init__(self):
+        self.inicio = time.time()
+        self.fuentes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, fuente: str, clave: str, n: float = 1) -> None:
+        fuente = nombre_fuente(fuente)
+        with self._lock:
+            d = self.fuentes.setdefault(fuente, {})
+            d[clave] = d.get(clave, 0) + n
+
+    def tiempo(self, fuente: str, etapa: str, segundos: float) -> None:
+        self.sumar(fuente, f"{etapa}_s", segundos)
+
+    @contextmanager
+    def etapa(self, fuente: str, etapa: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempo(fuente, etapa, time.perf_counter() - t0)
+
+    def fusionar(self, fuentes: Dict[str, Dict[str, float]]) -> None:
+        """Suma lo medido por otro proceso (volcado con ENV_SALIDA)."""
+        for fuente, valores in fuentes.items():
+            for clave, n in valores.items():
+                self.sumar(fuente, clave, n)
+
+    def resumen(self, status: str, **extra: Any) -> Dict[str, Any]:
+        """Línea de corrida compatible con Metricas.leer_corridas (+ detalle por fuente)."""
+        fin = time.time()
+        with self._lock:
+            fuentes = {
+                f: {k: (round(v, 4) if isinstance(v, float) else v) for k, v in sorted(d.items())}
+                for f, d in sorted(self.fuentes.items())
+            }
+        return {
+            "ts_start": _ts(self.inicio),
+            "ts_end": _ts(fin),
+            "duration_sec": round(fin - self.inicio, 2),
+            "status": status,
+            **extra,
+            "fuentes": fuentes,
+        }
+
+
+# ===================== Corrida activa del proceso =====================
+_activa: Optional[Corrida] = None
+
+
+def iniciar() -> Corrida:
+    global _activa
+    _activa = Corrida()
+    return _activa
+
+
+def actual() -> Optional[Corrida]:
+    return _activa
+
+
+def sumar(fuente: str, clave: str, n: float = 1) -> None:
+    if _activa is not None:
+        _activa.sumar(fuente, clave, n)
+
+
+def tiempo(fuente: str, etapa: str, segundos: float) -> None:
+    if _activa is not None:
+        _activa.tiempo(fuente, etapa, segundos)
+
+
+def etapa(fuente: str, nombre: str):
+    """Context manager que mide `nombre`; no hace nada si no hay corrida activa."""
+    return _activa.etapa(fuente, nombre) if _activa is not None else nullcontext()
+
+
+def _volcar(ruta: str) -> None:
+    if _activa is not None:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(_activa.fuentes, f)
+
+
+if os.environ.get(ENV_SALIDA):
+    iniciar()
+    atexit.register(_volcar, os.environ[ENV_SALIDA])
+
+
+# ===================== Exportadores =====================
+def escribir_jsonl(registro: Dict[str, Any], ruta: str) -> None:
+    """Agrega la corrida como una línea JSON (el mismo log que lee Metricas.py)."""
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def _etiqueta(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exportar_prometheus(registro: Dict[str, Any], ruta: str) -> None:
+    """
+    Formato textfile de Prometheus (node_exporter --collector.textfile) con la
+    última corrida. Se escribe en un .tmp y se reemplaza para que el collector
+    nunca lea un archivo a medias.
+    """
+    etapas, contadores = [], {}
+    for fuente, valores in registro["fuentes"].items():
+        for clave, v in valores.items():
+            if clave.endswith("_s"):
+                etapas.append(f'quehay_etapa_segundos{{fuente="{_etiqueta(fuente)}",etapa="{clave[:-2]}"}} {v}')
+            else:
+                contadores.setdefault(clave, []).append(f'quehay_{clave}{{fuente="{_etiqueta(fuente)}"}} {v}')
+
+    lineas = [
+        "# HELP quehay_corrida_duracion_segundos Duración total de la última corrida del pipeline",
+        "# TYPE quehay_corrida_duracion_segundos gauge",
+        f"quehay_corrida_duracion_segundos {registro['duration_sec']}",
+        "# HELP quehay_corrida_ok 1 si la última corrida terminó OK",
+        "# TYPE quehay_corrida_ok gauge",
+        f"quehay_corrida_ok {1 if registro['status'] == 'OK' else 0}",
+        "# HELP quehay_corrida_timestamp_segundos Fin de la última corrida (epoch)",
+        "# TYPE quehay_corrida_timestamp_segundos gauge",
+        f"quehay_corrida_timestamp_segundos "
+        f"{int(datetime.strptime(registro['ts_end'], '%Y-%m-%d %H:%M:%S').timestamp())}",
+        "# HELP quehay_etapa_segundos Segundos por etapa y fuente en la última corrida",
+        "# TYPE quehay_etapa_segundos gauge",
+        *etapas,
+    ]
+    for clave, muestras in sorted(contadores.items()):
+        lineas.append(f"# TYPE quehay_{clave} gauge")
+        lineas.extend(muestras)
+
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lineas) + "\n")
+    os.replace(tmp, ruta)
@@ -0,0 +1,32 @@
+# parseo_html.py — Backend de parseo compartido por los scrapers (lxml + SoupStrainer / html.parser)
+import os
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  (solo para saber si está instalado)
+    HAY_LXML = True
+except ImportError:
+    HAY_LXML = False
+
+BACKENDS = ("lxml", "html.parser")
+# SCRAPER_PARSER=html.parser fuerza el árbol completo con el parser de la stdlib.
+BACKEND = os.environ.get("SCRAPER_PARSER") or ("lxml" if HAY_LXML else "html.parser")
+
+
+def crear_soup(html: str, solo: Optional[SoupStrainer] = None,
+               backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    backend='lxml'        → parser en C y, si se pasa `solo`, solo se materializan
+                            los subárboles que coinciden con el SoupStrainer.
+    backend='html.parser' → árbol completo de la página (comportamiento original).
+    """
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de parseo desconocido: {backend!r} (usa {', '.join(BACKENDS)})")
+    if backend == "lxml" and not HAY_LXML:
+        backend = "html.parser"
+    if backend == "html.parser":
+        return BeautifulSoup(html, "html.parser")
+    return BeautifulSoup(html, "lxml", parse_only=solo)
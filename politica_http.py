@@ -0,0 +1,263 @@
+# politica_http.py — Política de descarga por host: cubeta de tokens, concurrencia adaptativa y cortacircuitos
+"""
+Cada host tiene su PoliticaHost (compartida por todos los hilos/loops del proceso):
+
+  CuboTokens         a lo sumo `tasa` pedidos/s con ráfagas de `rafaga`; un 429
+                     con Retry-After pausa el host ese tiempo
+  LimiteAdaptativo   descargas simultáneas (AIMD): sube de a poco mientras la
+                     latencia se mantiene cerca de la mínima observada, baja a la
+                     mitad ante errores/timeouts y un 10 % si la latencia se dispara
+  Cortacircuitos     tras FALLOS_CIRCUITO descargas fallidas seguidas, el host se
+                     omite durante ENFRIAMIENTO segundos (sin tocar la red); luego
+                     se deja pasar un intento de prueba. Fallos y estado abierto se
+                     guardan en disco para que las corridas siguientes (cron,
+                     subprocesos) los sumen y respeten.
+
+El timeout de lectura también se adapta: TIMEOUT_LATENCIAS veces la latencia
+media del host (entre TIMEOUT_MIN y el timeout fijo), así un host lento falla
+rápido en vez de acumular esperas de 15 s.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+CIRCUITOS_DIR = BASE_DIR / ".cache_http" / "circuitos"
+
+TASA_POR_HOST = 4.0       # pedidos por segundo sostenidos
+RAFAGA = 8                # pedidos seguidos sin esperar
+CONCURRENCIA_INICIAL = 2  # descargas simultáneas al empezar (sube hasta max_por_host)
+TOLERANCIA_LATENCIA = 2.0 # latencia > TOLERANCIA x mínima observada (+50 ms) → congestión
+FALLOS_CIRCUITO = 3       # descargas fallidas seguidas que abren el circuito
+ENFRIAMIENTO = 300.0      # segundos con el circuito abierto
+VIGENCIA_FALLOS = 7 * 86400.0  # fallos más viejos que esto se olvidan (corridas por cron muy espaciadas)
+TIMEOUT_MIN = 3.0         # piso del timeout de lectura adaptativo
+TIMEOUT_LATENCIAS = 4.0   # timeout adaptativo = este factor x latencia media
+
+
+class CircuitoAbierto(Exception):
+    """El host falló FALLOS_CIRCUITO veces seguidas: se omite hasta que pase el enfriamiento."""
+
+
+class CuboTokens:
+    """Reserva sin bloqueo: cada pedido toma un token (el saldo puede quedar negativo) y espera lo que falte."""
+
+    def __init__(self, tasa: float = TASA_POR_HOST, rafaga: int = RAFAGA):
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self._tokens = float(rafaga)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self) -> float:
+        """Toma un token y devuelve cuántos segundos hay que esperar para usarlo."""
+        with self._lock:
+            ahora = time.monotonic()
+            self._tokens = min(self.rafaga, self._tokens + (ahora - self._ultimo) * self.tasa)
+            self._ultimo = ahora
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.tasa)
+
+    def pausar(self, segundos: float) -> None:
+        """Retry-After: nadie pide a este host durante `segundos`."""
+        with self._lock:
+            self._tokens = min(self._tokens, -segundos * self.tasa)
+
+    async def tomar(self) -> float:
+        espera = self.reservar()
+        if espera:
+            await asyncio.sleep(espera)
+        return espera
+
+
+class LimiteAdaptativo:
+    """
+    Semáforo cuyo tope cambia con lo observado. Sirve a varios event loops a la
+    vez (Main --parallel --in-process): los que esperan se despiertan con
+    call_soon_threadsafe en su propio loop.
+    """
+
+    def __init__(self, inicial: int = CONCURRENCIA_INICIAL, maximo: int = 4, minimo: int = 1,
+                 adaptativo: bool = True):
+        self.minimo = minimo
+        self.maximo = max(minimo, maximo)
+        self.adaptativo = adaptativo
+        # Sin adaptar queda como el semáforo fijo de antes: `maximo` descargas a la vez
+        self.limite = float(min(max(inicial, minimo), self.maximo)) if adaptativo else float(self.maximo)
+        self.en_vuelo = 0
+        self.latencia_min: Optional[float] = None
+        self._lock = threading.Lock()
+        self._esperando: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def entrar(self) -> None:
+        while True:
+            with self._lock:
+                if self.en_vuelo < int(self.limite):
+                    self.en_vuelo += 1
+                    return
+                loop = asyncio.get_running_loop()
+                turno = loop.create_future()
+                self._esperando.append((loop, turno))
+            await turno
+
+    def salir(self, latencia: Optional[float], ok: bool) -> None:
+        """latencia=None → no hubo respuesta (timeout/conexión): cuenta como error."""
+        with self._lock:
+            if not self.adaptativo:
+                pass
+            elif not ok or latencia is None:
+                self.limite = max(self.minimo, self.limite / 2)
+            else:
+                # Mínima con olvido lento: si el host mejora o empeora de forma estable, se reajusta
+                self.latencia_min = latencia if self.latencia_min is None else \
+                    min(latencia, self.latencia_min * 1.01)
+                if latencia > self.latencia_min * TOLERANCIA_LATENCIA + 0.05:
+                    self.limite = max(self.minimo, self.limite * 0.9)
+                else:
+                    self.limite = min(self.maximo, self.limite + 1 / self.limite)
+        self.liberar()
+
+    def liberar(self) -> None:
+        """Devuelve el turno sin ajustar el límite (p. ej. si la tarea se canceló)."""
+        with self._lock:
+            self.en_vuelo -= 1
+            despertar = list(self._esperando)
+            self._esperando.clear()
+        for loop, turno in despertar:
+            try:
+                loop.call_soon_threadsafe(_despertar, turno)
+            except RuntimeError:
+                pass  # loop ya cerrado
+
+
+def _despertar(turno: asyncio.Future) -> None:
+    if not turno.done():
+        turno.set_result(None)
+
+
+class Cortacircuitos:
+    """
+    cerrado → (FALLOS_CIRCUITO fallos seguidos) → abierto → (ENFRIAMIENTO) → un intento de prueba.
+    El conteo de fallos, el último fallo y el fin del enfriamiento viven en un JSON
+    por host que comparten todos los procesos: una fuente de una sola página que
+    corre como subproceso o por cron acumula sus fallos entre corridas. Fallos más
+    viejos que VIGENCIA_FALLOS ya no cuentan.
+    """
+
+    def __init__(self, host: str, fallos: int = FALLOS_CIRCUITO, enfriamiento: float = ENFRIAMIENTO,
+                 directorio: Optional[Path] = CIRCUITOS_DIR):
+        self.host = host
+        self.fallos_max = fallos
+        self.enfriamiento = enfriamiento
+        self.fallos = 0
+        self.ultimo_fallo = 0.0
+        self.abierto_hasta = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+        self._ruta = Path(directorio) / f"{host.replace(':', '_')}.json" if directorio else None
+        self._leer()
+
+    def _leer(self) -> None:
+        """Toma el estado de disco: otro proceso pudo sumar fallos o abrir el circuito."""
+        if not self._ruta:
+            return
+        try:
+            d = json.loads(self._ruta.read_text(encoding="utf-8"))
+            fallos, ultimo, abierto = int(d.get("fallos", 0)), float(d.get("ultimo_fallo", 0)), \
+                float(d.get("abierto_hasta", 0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            fallos, ultimo, abierto = 0, 0.0, 0.0
+        if time.time() - ultimo > VIGENCIA_FALLOS:
+            fallos = 0
+        self.fallos, self.ultimo_fallo, self.abierto_hasta = fallos, ultimo, abierto
+
+    def _guardar(self) -> None:
+        if not self._ruta:
+            return
+        try:
+            if self.fallos or self.abierto_hasta:
+                self._ruta.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self._ruta.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps({"host": self.host, "fallos": self.fallos, "ultimo_fallo": self.ultimo_fallo,
+                                           "abierto_hasta": self.abierto_hasta}), encoding="utf-8")
+                os.replace(tmp, self._ruta)
+            else:
+                self._ruta.unlink(missing_ok=True)
+        except OSError:
+            pass  # el estado en disco es una ayuda, no un requisito
+
+    def permitir(self) -> None:
+        """Lanza CircuitoAbierto si el host está en enfriamiento (o ya hay un intento de prueba en curso)."""
+        with self._lock:
+            self._leer()
+            if not self.abierto_hasta:
+                return
+            restante = self.abierto_hasta - time.time()
+            if restante > 0:
+                raise CircuitoAbierto(f"{self.host}: circuito abierto ({restante:.0f}s restantes)")
+            if self._prueba_en_curso:
+                raise CircuitoAbierto(f"{self.host}: circuito en prueba")
+            self._prueba_en_curso = True
+
+    def soltar_prueba(self) -> None:
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def exito(self) -> None:
+        with self._lock:
+            cambio = bool(self.fallos or self.abierto_hasta)
+            self.fallos, self.ultimo_fallo, self.abierto_hasta, self._prueba_en_curso = 0, 0.0, 0.0, False
+            if cambio:
+                self._guardar()
+
+    def fallo(self) -> bool:
+        """Registra una descarga fallida; devuelve True si con ella se abrió el circuito."""
+        with self._lock:
+            self._leer()
+            self.fallos += 1
+            self.ultimo_fallo = time.time()
+            abre = self._prueba_en_curso or self.fallos >= self.fallos_max
+            if abre:
+                self.abierto_hasta = self.ultimo_fallo + self.enfriamiento
+                self._prueba_en_curso = False
+            self._guardar()
+            return abre
+
+
+class PoliticaHost:
+    """
+    Cubeta, límite adaptativo, cortacircuitos y latencia media (para el timeout) de un host.
+    limitar=False → sin cubeta ni adaptación (tope fijo de max_por_host): para
+    servidores locales de benchmarks, donde la tasa mediría al limitador y no al código.
+    """
+
+    def __init__(self, host: str, max_por_host: int, timeout: float,
+                 tasa: float = TASA_POR_HOST, rafaga: int = RAFAGA, circuitos_dir: Optional[Path] = CIRCUITOS_DIR,
+                 limitar: bool = True):
+        self.host = host
+        self.cubo: Optional[CuboTokens] = CuboTokens(tasa, rafaga) if limitar else None
+        self.limite = LimiteAdaptativo(CONCURRENCIA_INICIAL, max_por_host, adaptativo=limitar)
+        self.circuito = Cortacircuitos(host, directorio=circuitos_dir)
+        self.timeout_max = timeout
+        self._latencia_media: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def timeout(self) -> float:
+        """Timeout de lectura para el próximo pedido."""
+        with self._lock:
+            if self._latencia_media is None:
+                return self.timeout_max
+            return min(self.timeout_max, max(TIMEOUT_MIN, TIMEOUT_LATENCIAS * self._latencia_media))
+
+    def observar(self, latencia: Optional[float], ok: bool) -> None:
+        self.limite.salir(latencia, ok)
+        if latencia is not None:
+            with self._lock:
+                m = self._latencia_media
+                self._latencia_media = latencia if m is None else 0.8 * m + 0.2 * latencia
+
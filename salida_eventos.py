@@ -0,0 +1,58 @@
+# salida_eventos.py — Escritura/lectura de eventos scrapeados: JSON (array) o NDJSON (un evento por línea)
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator
+
+FORMATOS = ("json", "ndjson")
+
+
+def ruta_salida(ruta_json: str, formato: str) -> str:
+    """'scraping_x.json' → 'scraping_x.ndjson' cuando formato='ndjson'."""
+    return ruta_json if formato == "json" else os.path.splitext(ruta_json)[0] + ".ndjson"
+
+
+def guardar_eventos(eventos: Iterable[Dict[str, Any]], ruta_json: str,
+                    formato: str = "json", eco: bool = True) -> int:
+    """
+    json   → array con indent=4 (formato histórico) y eco del array completo.
+    ndjson → cada evento se escribe (y se imprime) en cuanto llega del iterable,
+             sin armar la lista completa. Se escribe en un .tmp y se reemplaza al
+             final para que el cargador nunca lea un archivo a medias.
+    Devuelve cuántos eventos se guardaron.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato!r} (usa {', '.join(FORMATOS)})")
+    ruta = ruta_salida(ruta_json, formato)
+
+    if formato == "json":
+        eventos = list(eventos)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(eventos, f, indent=4, ensure_ascii=False)
+        if eco:
+            print(json.dumps(eventos, indent=4, ensure_ascii=False))
+        return len(eventos)
+
+    n = 0
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for ev in eventos:
+            linea = json.dumps(ev, ensure_ascii=False)
+            f.write(linea + "\n")
+            if eco:
+                print(linea, flush=True)
+            n += 1
+    os.replace(tmp, ruta)
+    return n
+
+
+def leer_ndjson(ruta: str) -> Iterator[Dict[str, Any]]:
+    """Generador: un evento por línea; ignora líneas vacías y las que no son JSON válido."""
+    with open(ruta, "r", encoding="utf-8-sig") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                continue
@@ -1,114 +1,32 @@
 # scraping_idartes.py
-import requests
-from bs4 import BeautifulSoup
-import json
+import argparse
+import asyncio
+import queue
 import re
-from datetime import datetime
-import os
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+from descargas import DESCARGADOR, Pagina, parsear_pagina, scrapear
+from extraccion import PROCESOS_PARSEO, extractor, pool_parseo
+from fechas_es import normalizar_rango as normalizar_fecha_es
+from fuentes import obtener, ruta_archivo
+from politica_http import CircuitoAbierto
+from salida_eventos import FORMATOS, guardar_eventos, ruta_salida
 
-MESES = {
-    "enero": "01", "febrero": "02", "marzo": "03",
-    "abril": "04", "mayo": "05", "junio": "06",
-    "julio": "07", "agosto": "08", "septiembre": "09",
-    "octubre": "10", "noviembre": "11", "diciembre": "12"
-}
+URL = obtener("idartes")["url"]
 
-
-def convertir_fecha_simple(fecha_txt: str, year: int) -> Optional[str]:
-    """
-    Convierte textos tipo '10 de noviembre' -> 'YYYY-11-10'
-    Devuelve None si no puede convertir.
-    """
-    if not fecha_txt:
-        return None
-    try:
-        partes = fecha_txt.replace("de", " ").split()
-        partes = [p.strip() for p in partes if p.strip()]
-        if len(partes) >= 2:
-            dia = partes[0]
-            mes = MESES.get(partes[1].lower())
-            if mes and dia.isdigit():
-                return f"{year}-{mes.zfill(2)}-{dia.zfill(2)}"
-    except Exception:
-        return None
-    return None
-
-
-def normalizar_fecha_es(fecha_raw: str, year: int = datetime.now().year) -> Dict[str, Optional[str]]:
-    """
-    Normaliza fechas en español que pueden venir como:
-      - '10 al 12 de noviembre'
-      - '5 de diciembre - 7:30 p.m.'
-      - '12 de noviembre'
-    Retorna dict con: fecha_inicio, fecha_fin, hora (strings o None).
-    No 'adivina' formatos raros: si no puede, deja None lo que no se pueda inferir.
-    """
-    out = {"fecha_inicio": None, "fecha_fin": None, "hora": None}
-    if not fecha_raw or fecha_raw == "N/A":
-        return out
-
-    txt = " ".join(fecha_raw.split()).strip().lower()
-
-    # Capturar hora si viene en el texto (p. ej., " - 7:00 p.m." o "7:00 pm")
-    hora_match = re.search(r'(\d{1,2}[:.]\d{2}\s*(a\.?m\.?|p\.?m\.?)?)', txt, re.IGNORECASE)
-    if hora_match:
-        out["hora"] = hora_match.group(1)
-
-    # Rango: "10 al 12 de noviembre"
-    if " al " in txt:
-        partes = [p.strip() for p in txt.split(" al ")]
-        # partes[0] ~ "10" o "10 de noviembre"
-        # partes[1] ~ "12 de noviembre"
-        # Tomamos el mes del segundo fragmento
-        m2 = re.search(r"(\d{1,2})\s+de\s+([a-záéíóú]+)", partes[1], re.IGNORECASE)
-        if m2:
-            dia2 = m2.group(1)
-            mes_txt = m2.group(2).lower()
-            mes2 = MESES.get(mes_txt, None)
-            # fecha inicio: intentamos "10 de <mes_txt>" si el primero no trae mes
-            m1 = re.search(r"(\d{1,2})\s+de\s+([a-záéíóú]+)", partes[0], re.IGNORECASE)
-            if m1:
-                dia1 = m1.group(1)
-                mes1 = MESES.get(m1.group(2).lower(), None)
-            else:
-                # Primer fragmento solo trae día
-                m1d = re.search(r"(\d{1,2})", partes[0])
-                dia1 = m1d.group(1) if m1d else None
-                mes1 = mes2
-
-            if mes1 and mes2 and dia1 and dia2:
-                out["fecha_inicio"] = f"{year}-{mes1.zfill(2)}-{str(dia1).zfill(2)}"
-                out["fecha_fin"] = f"{year}-{mes2.zfill(2)}-{str(dia2).zfill(2)}"
-                return out
-        # Si no se pudo parsear como rango, caemos a intentos simples más abajo.
-
-    # Caso "5 de diciembre - 7:30 p.m." o "5 de diciembre"
-    m = re.search(r"(\d{1,2})\s+de\s+([a-záéíóú]+)", txt, re.IGNORECASE)
-    if m:
-        dia = m.group(1)
-        mes_txt = m.group(2).lower()
-        mes = MESES.get(mes_txt, None)
-        if mes and dia.isdigit():
-            fecha = f"{year}-{mes.zfill(2)}-{dia.zfill(2)}"
-            out["fecha_inicio"] = fecha
-            out["fecha_fin"] = fecha
-            return out
-
-    # Último recurso: intenta 'simple' con el primer número + primer mes encontrado
-    m_dia = re.search(r"(\d{1,2})", txt)
-    m_mes = re.search(r"(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)", txt, re.IGNORECASE)
-    if m_dia and m_mes:
-        dia = m_dia.group(1)
-        mes = MESES.get(m_mes.group(1).lower(), None)
-        if mes and dia.isdigit():
-            fecha = f"{year}-{mes.zfill(2)}-{dia.zfill(2)}"
-            out["fecha_inicio"] = fecha
-            out["fecha_fin"] = fecha
-
-    return out
+# Crawl multipágina (paginador Drupal: ?page=N, base 0)
+MAX_PAGINAS = 10
+CONCURRENCIA_PAGINAS = 4
+# Workers de parseo para el crawl (0 = parsear en hilos del mismo proceso).
+# Con un solo núcleo el pool solo agrega el costo de arrancar los workers.
+PROCESOS_CRAWL = min(PROCESOS_PARSEO, MAX_PAGINAS) if PROCESOS_PARSEO > 1 else 0
+# Arrancar los workers ('spawn') cuesta ~0.4 s contra ~0.04 s por página en un hilo:
+# el pool solo se estrena si el crawl tiene más páginas que esto (con MAX_PAGINAS por
+# defecto, nunca en una corrida suelta) o si ya está caliente: Main --daemon lo
+# arranca al iniciar con calentar_pool() y lo reutiliza en cada refresco.
+PAGINAS_MIN_POOL = 10
+PAGINA_RE = re.compile(r"[?&](?:amp;)?page=(\d+)")
 
 
 def normalizar_ingreso(ingreso_raw: str) -> str:
@@ -141,76 +59,224 @@ def limpiar_nombre(nombre_raw: str) -> str:
     return s
 
 
-def scrape_idartes() -> List[Dict[str, Any]]:
+def scrape_idartes(html: Optional[str] = None, backend: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Descarga y parsea la agenda de Idartes.
+    Descarga (vía descargas.scrapear, con caché condicional) y parsea la agenda
+    de Idartes. Si se pasa `html`, se parsea ese contenido sin ir a la red.
+    `backend`: ver parseo_html.crear_soup (por defecto parseo_html.BACKEND).
     Devuelve una lista de dicts con:
       - tipo, nombre, fecha_inicio, fecha_fin, hora, ingreso, url
     """
-    url = "https://www.idartes.gov.co/es/agenda"
-    response = requests.get(url, timeout=15)
-    response.raise_for_status()
-    response.encoding = "utf-8"
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    eventos: List[Dict[str, Any]] = []
-    contenedores = soup.find_all("div", class_="cajashomeeventos")
-
-    for cont in contenedores:
-        # Tipo
-        tipo_elem = cont.find("div", class_="ctg-ev-24 position-absolute bg-white")
-        tipo = tipo_elem.get_text(strip=True) if tipo_elem else "N/A"
-
-        # Nombre + URL
-        nombre_elem = cont.select_one('a[hreflang="es"]')
-        url_oficial = None
-        if nombre_elem:
-            nombre = nombre_elem.get_text(strip=True)
-            href = nombre_elem.get("href") or ""
-            if href.startswith("/"):
-                url_oficial = "https://www.idartes.gov.co" + href
-            elif href.startswith("http"):
-                url_oficial = href
-            # Si no hay texto, inferir desde el slug
-            if not nombre:
-                if href:
-                    slug = href.strip("/").split("/")[-1]
-                    nombre = slug.replace("-", " ").title()
-        else:
-            nombre = "N/A"
-
-        # Fecha bruta + ingreso
-        fecha_elem = cont.find("div", class_="fecha-ev24")
-        fecha_raw = fecha_elem.get_text(" ", strip=True) if fecha_elem else "N/A"
-
-        ingreso_elem = cont.find("div", class_="tipo_cajashomeeventos font2")
-        ingreso_raw = ingreso_elem.get_text(strip=True) if ingreso_elem else "N/A"
-
-        # Normalizaciones
-        nombre = limpiar_nombre(nombre)
-        ingreso = normalizar_ingreso(ingreso_raw)
-        fecha_norm = normalizar_fecha_es(fecha_raw)
-
-        evento = {
-            "tipo": tipo,
-            "nombre": nombre,
-            "fecha_inicio": fecha_norm["fecha_inicio"],
-            "fecha_fin": fecha_norm["fecha_fin"],
-            "hora": fecha_norm["hora"],
-            "ingreso": ingreso,
-            "url": url_oficial
-        }
-        eventos.append(evento)
-
-    return eventos
+    if html is None:
+        return scrapear(URL, scrape_idartes)
+    return list(iterar_eventos(html, backend))
+
+
+def armar_evento(campos: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    'post' de la declaración 'idartes' (fuentes.py): a partir de los campos
+    crudos de una tarjeta arma el evento normalizado.
+    """
+    # Nombre + URL
+    url_oficial = None
+    nombre = campos["_enlace"]
+    if nombre is not None:
+        href = campos["_href"] or ""
+        if href.startswith("/"):
+            url_oficial = "https://www.idartes.gov.co" + href
+        elif href.startswith("http"):
+            url_oficial = href
+        # Si no hay texto, inferir desde el slug
+        if not nombre:
+            if href:
+                slug = href.strip("/").split("/")[-1]
+                nombre = slug.replace("-", " ").title()
+    else:
+        nombre = "N/A"
+
+    # Normalizaciones
+    nombre = limpiar_nombre(nombre)
+    ingreso = normalizar_ingreso(campos["_ingreso"])
+    fecha_norm = normalizar_fecha_es(campos["_fecha"])
+
+    return {
+        "tipo": campos["tipo"],
+        "nombre": nombre,
+        "fecha_inicio": fecha_norm["fecha_inicio"],
+        "fecha_fin": fecha_norm["fecha_fin"],
+        "hora": fecha_norm["hora"],
+        "ingreso": ingreso,
+        "url": url_oficial
+    }
+
+
+def iterar_eventos(html: str, backend: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Generador: entrega cada tarjeta ya normalizada apenas se extrae (declaración 'idartes')."""
+    return extractor("idartes").iterar(html, backend)
+
+
+# ===================== Crawl multipágina =====================
+def url_pagina(n: int) -> str:
+    return URL if n == 0 else f"{URL}?page={n}"
+
+
+def ultima_pagina(html: str) -> int:
+    """Mayor ?page=N enlazado en el paginador (0 si la agenda cabe en una página)."""
+    return max((int(n) for n in PAGINA_RE.findall(html)), default=0)
+
+
+def clave_evento(ev: Dict[str, Any]) -> tuple:
+    return (ev.get("url") or ev.get("nombre"), ev.get("fecha_inicio"))
+
+
+async def recorrer_agenda(html_inicial: Optional[str] = None, max_paginas: int = MAX_PAGINAS,
+                          concurrencia: int = CONCURRENCIA_PAGINAS,
+                          backend: Optional[str] = None,
+                          procesos: int = PROCESOS_CRAWL) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Recorre las páginas de la agenda con a lo sumo `concurrencia` descargas en vuelo
+    y entrega los eventos nuevos de cada página apenas llega (sin esperar al resto).
+    Deja de pedir páginas cuando una no aporta eventos nuevos o se alcanza max_paginas;
+    las que ya estaban en vuelo se terminan de procesar.
+    procesos > 0 → cada HTML se parsea en un worker de extraccion.PoolParseo
+    (varios núcleos) si el pool ya está caliente o el crawl supera PAGINAS_MIN_POOL
+    páginas; si no, o con 0, en un hilo de este proceso (comparte el GIL).
+    """
+    vistos = set()
+
+    def nuevos(eventos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        out = []
+        for ev in eventos:
+            k = clave_evento(ev)
+            if k not in vistos:
+                vistos.add(k)
+                out.append(ev)
+        return out
+
+    def parsear(html: str) -> List[Dict[str, Any]]:
+        return scrape_idartes(html, backend)
+
+    candidato = pool_parseo(procesos) if procesos > 0 else None
+    pool = candidato if candidato is not None and candidato.caliente else None
+
+    async def parsear_async(pagina) -> List[Dict[str, Any]]:
+        # El parseo sale del loop para no frenar las otras descargas
+        if pool is not None:
+            return await pool.parsear("idartes", pagina, backend)
+        return await asyncio.to_thread(parsear_pagina, pagina, parsear)
+
+    async def traer(n: int):
+        pagina = await DESCARGADOR.obtener_pagina(url_pagina(n))
+        eventos = await parsear_async(pagina)
+        return n, pagina.texto, eventos
+
+    if html_inicial is None:
+        _, html_inicial, eventos = await traer(0)
+    elif pool is not None:
+        eventos = await parsear_async(Pagina(url_pagina(0), html_inicial))
+    else:
+        eventos = await asyncio.to_thread(parsear, html_inicial)
+    primeros = nuevos(eventos)
+    if primeros:
+        yield primeros
+    else:
+        return
+
+    limite = min(ultima_pagina(html_inicial), max_paginas - 1)
+    if pool is None and candidato is not None and limite + 1 > PAGINAS_MIN_POOL:
+        pool = candidato
+    siguiente, parar = 1, False
+    en_vuelo = set()
+    try:
+        while en_vuelo or (not parar and siguiente <= limite):
+            while not parar and siguiente <= limite and len(en_vuelo) < concurrencia:
+                en_vuelo.add(asyncio.ensure_future(traer(siguiente)))
+                siguiente += 1
+            listos, en_vuelo = await asyncio.wait(en_vuelo, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in listos:
+                try:
+                    n, html, eventos = tarea.result()
+                except CircuitoAbierto:
+                    raise  # agenda a medias: mejor que el loader use el último JSON completo
+                except Exception as e:
+                    print(f"⚠️ Idartes: página omitida ({type(e).__name__}: {e})")
+                    continue
+                # Paginadores con ventana (1 2 3 … siguiente) revelan páginas nuevas al avanzar
+                limite = min(max(limite, ultima_pagina(html)), max_paginas - 1)
+                aporte = nuevos(eventos)
+                if not aporte:
+                    parar = True
+                    continue
+                yield aporte
+    finally:
+        for tarea in en_vuelo:
+            tarea.cancel()
+
+
+def calentar_pool(procesos: int = PROCESOS_CRAWL) -> None:
+    """Arranca los workers de parseo del crawl (no-op con 0 procesos, p. ej. en un núcleo)."""
+    if procesos > 0:
+        pool_parseo(procesos).calentar()
+
+
+def crawl_idartes(html_inicial: Optional[str] = None, max_paginas: int = MAX_PAGINAS,
+                  concurrencia: int = CONCURRENCIA_PAGINAS,
+                  backend: Optional[str] = None,
+                  procesos: int = PROCESOS_CRAWL) -> Iterator[Dict[str, Any]]:
+    """
+    Versión síncrona de recorrer_agenda: generador que va entregando evento por
+    evento mientras el resto de páginas sigue descargándose en otro hilo.
+    """
+    canal: "queue.Queue" = queue.Queue(maxsize=concurrencia * 2)
+    FIN = object()
+
+    async def productor():
+        async for lote in recorrer_agenda(html_inicial, max_paginas, concurrencia, backend, procesos):
+            await asyncio.to_thread(canal.put, lote)
+
+    def hilo():
+        try:
+            asyncio.run(productor())
+            canal.put(FIN)
+        except BaseException as e:
+            canal.put(e)
+
+    threading.Thread(target=hilo, daemon=True).start()
+    while True:
+        item = canal.get()
+        if item is FIN:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield from item
+
+
+def scrape_idartes_completo(html: Optional[str] = None, max_paginas: int = MAX_PAGINAS,
+                            concurrencia: int = CONCURRENCIA_PAGINAS,
+                            procesos: int = PROCESOS_CRAWL) -> List[Dict[str, Any]]:
+    """Toda la agenda (hasta max_paginas). `html`: primera página ya descargada, si la hay."""
+    return list(crawl_idartes(html, max_paginas, concurrencia, procesos=procesos))
+
+
+# Cada página se cachea por separado; que la primera no haya cambiado no dice nada de las demás.
+scrape_idartes_completo.cache_derivado = False
 
 
 if __name__ == "__main__":
-    # Ejecuta el scraping y guarda el JSON localmente
-    eventos = scrape_idartes()
-    ruta_salida = os.path.join(BASE_DIR, "scraping_idartes.json")
-    with open(ruta_salida, "w", encoding="utf-8") as f:
-        json.dump(eventos, f, indent=4, ensure_ascii=False)
-
-    print(json.dumps(eventos, indent=4, ensure_ascii=False))
-    print(f"✅ {len(eventos)} eventos normalizados guardados en {ruta_salida}")
+    ap = argparse.ArgumentParser(description="Scraping de la agenda de Idartes")
+    ap.add_argument("--max-paginas", type=int, default=MAX_PAGINAS, help="1 = solo la primera página")
+    ap.add_argument("--concurrencia", type=int, default=CONCURRENCIA_PAGINAS,
+                    help="Páginas descargándose a la vez")
+    ap.add_argument("--procesos", type=int, default=PROCESOS_CRAWL,
+                    help="Workers de parseo en procesos aparte (0 = hilos del mismo proceso; "
+                         f"el pool solo arranca con más de {PAGINAS_MIN_POOL} páginas)")
+    ap.add_argument("--formato", choices=FORMATOS, default="json",
+                    help="ndjson: un evento por línea, escrito a medida que llegan las páginas")
+    args = ap.parse_args()
+
+    # Ejecuta el scraping y guarda el resultado localmente
+    eventos = crawl_idartes(max_paginas=args.max_paginas, concurrencia=args.concurrencia,
+                            procesos=args.procesos)
+    ruta_json = ruta_archivo(obtener("idartes"))
+    n = guardar_eventos(eventos, ruta_json, args.formato)
+    print(f"✅ {n} eventos normalizados guardados en {ruta_salida(ruta_json, args.formato)}")
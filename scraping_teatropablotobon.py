@@ -1,35 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+import argparse
 import re
-import json
-import os
-from datetime import datetime
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-MESES = {
-    "enero": "01", "febrero": "02", "marzo": "03",
-    "abril": "04", "mayo": "05", "junio": "06",
-    "julio": "07", "agosto": "08", "septiembre": "09",
-    "octubre": "10", "noviembre": "11", "diciembre": "12"
-}
-
-def convertir_fecha_simple(fecha_txt: str, year: int):
-    try:
-        partes = fecha_txt.replace("de", "").split()
-        if len(partes) >= 2:
-            dia = partes[0]
-            mes = MESES.get(partes[1].lower())
-            if mes:
-                return f"{year}-{mes.zfill(2)}-{dia.zfill(2)}"
-    except Exception:
-        return fecha_txt.title()
-    return fecha_txt.title()
-
-def normalizar_fecha_es(fecha_raw: str, year: int = datetime.now().year):
-    if not fecha_raw or fecha_raw == "N/A":
-        return None
-    return convertir_fecha_simple(fecha_raw, year)
+from typing import Optional
+
+from descargas import scrapear
+from fechas_es import fecha_o_texto as normalizar_fecha_es
+from fuentes import obtener, ruta_archivo
+from parseo_html import crear_soup
+from salida_eventos import FORMATOS, guardar_eventos, ruta_salida
+
+URL = obtener("pablobon")["url"]
+# find_previous/find_next recorren títulos y divs: se descarta todo lo demás (scripts, svg, menús)
+SOLO_EVENTOS = SoupStrainer(["h2", "div"])
 
 def normalizar_ingreso(ingreso_raw: str):
     ingreso_raw = ingreso_raw.lower()
@@ -56,59 +38,95 @@ def normalizar_tipo(tipo_raw: str):
         return "COMEDIA"
     return "OTROS"
 
-def scrape_eventos():
-    url = "https://teatropablotobon.com/eventos/"
-    resp = requests.get(url, timeout=15)
-    resp.encoding = "utf-8"
-    soup = BeautifulSoup(resp.text, "html.parser")
-
+# Patrones compilados una sola vez (antes se recompilaban por cada título)
+TIPO_CHIP_RE = re.compile(r"chips__chip.*(musica|teatro|danza|comedia|otros)", re.IGNORECASE)
+INGRESO_CHIP_RE = re.compile(r"chips__chip.*entrada", re.IGNORECASE)
+FECHA_RE = re.compile(r"(\d{1,2}\s+de\s+\w+)", re.IGNORECASE)
+
+MODOS_EXTRACCION = ("lineal", "por_titulo")
+
+def construir_evento(nombre: str, chips_block, fecha_block) -> dict:
+    tipo, ingreso = "N/A", "N/A"
+    if chips_block:
+        tipo_chip = chips_block.find("div", class_=TIPO_CHIP_RE)
+        if tipo_chip:
+            tipo = tipo_chip.get_text(strip=True)
+
+        ingreso_chip = chips_block.find("div", class_=INGRESO_CHIP_RE)
+        if ingreso_chip:
+            ingreso = ingreso_chip.get_text(strip=True)
+
+    fecha = "N/A"
+    if fecha_block:
+        fecha_tags = fecha_block.find_all("p", class_="mb-0")
+        fecha_text = " ".join([f.get_text(strip=True) for f in fecha_tags]) if fecha_tags else ""
+        fecha_match = FECHA_RE.search(fecha_text)
+        if fecha_match:
+            fecha = fecha_match.group(1)
+
+    return {
+        "tipo": normalizar_tipo(tipo),
+        "nombre": limpiar_nombre(nombre),
+        "fecha": normalizar_fecha_es(fecha),
+        "ingreso": normalizar_ingreso(ingreso)
+    }
+
+def es_titulo_evento(nombre: str) -> bool:
+    return bool(nombre) and "pasados" not in nombre.lower()
+
+def extraer_lineal(soup) -> list:
+    """
+    Un solo recorrido en orden de documento por h2 y div:
+      - chips_block = último div.chips visto antes del título (= find_previous)
+      - fecha_block = primer div que aparece después del título (= find_next)
+    Costo lineal en el tamaño de la página.
+    """
+    tarjetas = []      # [nombre, chips_block, fecha_block]
+    pendientes = []    # títulos que aún esperan su primer div siguiente
+    ultimo_chips = None
+    for el in soup.find_all(["h2", "div"]):
+        if el.name == "h2":
+            nombre = el.get_text(strip=True)
+            if es_titulo_evento(nombre):
+                tarjeta = [nombre, ultimo_chips, None]
+                tarjetas.append(tarjeta)
+                pendientes.append(tarjeta)
+            continue
+        for tarjeta in pendientes:
+            tarjeta[2] = el
+        pendientes.clear()
+        if "chips" in (el.get("class") or []):
+            ultimo_chips = el
+    return [construir_evento(*t) for t in tarjetas]
+
+def extraer_por_titulo(soup) -> list:
+    """Versión original: find_previous/find_next por cada h2 (recorre el documento cada vez)."""
     eventos_data = []
-    titulos = soup.find_all("h2")
-
-    for t in titulos:
+    for t in soup.find_all("h2"):
         nombre = t.get_text(strip=True)
-        if not nombre or "pasados" in nombre.lower():
+        if not es_titulo_evento(nombre):
             continue
-
-        tipo, ingreso = "N/A", "N/A"
         chips_block = t.find_previous("div", class_="chips")
-        if chips_block:
-            tipo_chip = chips_block.find(
-                "div",
-                class_=re.compile(r"chips__chip.*(musica|teatro|danza|comedia|otros)", re.IGNORECASE)
-            )
-            if tipo_chip:
-                tipo = tipo_chip.get_text(strip=True)
-
-            ingreso_chip = chips_block.find("div", class_=re.compile(r"chips__chip.*entrada", re.IGNORECASE))
-            if ingreso_chip:
-                ingreso = ingreso_chip.get_text(strip=True)
-
-        fecha = "N/A"
         fecha_block = t.find_next("div")
-        if fecha_block:
-            fecha_tags = fecha_block.find_all("p", class_="mb-0")
-            fecha_text = " ".join([f.get_text(strip=True) for f in fecha_tags]) if fecha_tags else ""
-            fecha_match = re.search(r"(\d{1,2}\s+de\s+\w+)", fecha_text, re.IGNORECASE)
-            if fecha_match:
-                fecha = fecha_match.group(1)
-
-        evento = {
-            "tipo": normalizar_tipo(tipo),
-            "nombre": limpiar_nombre(nombre),
-            "fecha": normalizar_fecha_es(fecha),
-            "ingreso": normalizar_ingreso(ingreso)
-        }
-
-        eventos_data.append(evento)
-
+        eventos_data.append(construir_evento(nombre, chips_block, fecha_block))
     return eventos_data
 
+def scrape_eventos(html: Optional[str] = None, backend: Optional[str] = None, modo: str = "lineal"):
+    if html is None:
+        return scrapear(URL, scrape_eventos)
+    if modo not in MODOS_EXTRACCION:
+        raise ValueError(f"Modo de extracción desconocido: {modo!r} (usa {', '.join(MODOS_EXTRACCION)})")
+    soup = crear_soup(html, SOLO_EVENTOS, backend)
+    if modo == "por_titulo":
+        return extraer_por_titulo(soup)
+    return extraer_lineal(soup)
+
 if __name__ == "__main__":
-    eventos = scrape_eventos()
-    ruta_salida = os.path.join(BASE_DIR, "scraping_teatropablotobon.json")
-    with open(ruta_salida, "w", encoding="utf-8") as f:
-        json.dump(eventos, f, indent=4, ensure_ascii=False)
+    ap = argparse.ArgumentParser(description="Scraping del Teatro Pablo Tobón Uribe")
+    ap.add_argument("--formato", choices=FORMATOS, default="json", help="ndjson: un evento por línea")
+    args = ap.parse_args()
 
-    print(json.dumps(eventos, indent=4, ensure_ascii=False))
-    print(f"✅ {len(eventos)} eventos normalizados guardados en {ruta_salida}")
+    eventos = scrape_eventos()
+    ruta_json = ruta_archivo(obtener("pablobon"))
+    n = guardar_eventos(eventos, ruta_json, args.formato)
+    print(f"✅ {n} eventos normalizados guardados en {ruta_salida(ruta_json, args.formato)}")